@@ -0,0 +1,225 @@
+"""
+Copyright (c) 2024 X Developments
+
+Column-oriented storage for the submission rows of the 'DrumAndBassHeadsUK Spreadsheets' sheet, used by
+sheetbot.py to hold the shared snapshot for the whole lifetime of the bot.
+
+Run this file directly to print a memory report comparing it with the list-of-dicts form returned by
+gspread's get_all_records:
+
+    python rowstore.py [row_count ...]
+
+"""
+
+import datetime as dt
+import random
+import sys
+import tracemalloc
+from array import array
+from types import SimpleNamespace
+
+# String columns, stored as indexes into the store's shared string table
+STRING_COLUMNS = ('week_label', 'date_label', 'name', 'discord', 'song_name', 'listen_link', 'comment', 'buy_link',
+                  'week_image', 'thumbnail_image')
+
+
+class StringTable:
+    """Deduplicated strings; each distinct value is kept once and referred to by its index."""
+
+    def __init__(self):
+        self.values = ['']
+        self.ids = {'': 0}
+
+    def add(self, value):
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = len(self.values)
+            self.values.append(value)
+            self.ids[value] = string_id
+        return string_id
+
+    def __getitem__(self, string_id):
+        return self.values[string_id]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class StoredRow:
+    """Read-only view of one row in a RowStore, with the same attributes as sheetbot.SheetRow."""
+
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def line(self):
+        return self.store.line[self.index]
+
+    @property
+    def week(self):
+        return self.store.week[self.index]
+
+    @property
+    def date(self):
+        ordinal = self.store.date[self.index]
+        return dt.date.fromordinal(ordinal) if ordinal else None
+
+    @property
+    def discord_id(self):
+        return self.store.discord_id[self.index] or None
+
+    @property
+    def colour(self):
+        colour = self.store.colour[self.index]
+        return None if colour < 0 else colour
+
+    def __getattr__(self, name):
+        column = self.store.string_columns.get(name)
+        if column is None:
+            raise AttributeError(name)
+        return self.store.strings[column[self.index]]
+
+
+class RowSequence:
+    """Lazy sequence of the rows at `indexes` in a RowStore; a StoredRow is only created for a row that is read."""
+
+    __slots__ = ('store', 'indexes')
+
+    def __init__(self, store, indexes):
+        self.store = store
+        self.indexes = indexes
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [StoredRow(self.store, index) for index in self.indexes[item]]
+        return StoredRow(self.store, self.indexes[item])
+
+    def __iter__(self):
+        return (StoredRow(self.store, index) for index in self.indexes)
+
+
+class RowStore:
+    """Sheet rows kept as typed arrays, one per column, plus a table of deduplicated strings.
+
+    Integer columns (sheet line, week, date ordinal, Discord ID, colour) are stored unboxed. Every string column
+    holds 4-byte indexes into one StringTable, so repeated names, dates, comments and images cost nothing extra.
+    Missing dates and Discord IDs are stored as 0 and missing colours as -1.
+    """
+
+    def __init__(self):
+        self.strings = StringTable()
+        self.line = array('I')
+        self.week = array('i')
+        self.date = array('i')
+        self.discord_id = array('q')
+        self.colour = array('i')
+        self.string_columns = {name: array('I') for name in STRING_COLUMNS}
+
+    def __len__(self):
+        return len(self.week)
+
+    def __iter__(self):
+        return (StoredRow(self, index) for index in range(len(self)))
+
+    def append(self, row):
+        """Add a row; `row` is anything with the SheetRow attributes. Returns its index in the store."""
+        self.line.append(row.line)
+        self.week.append(row.week)
+        self.date.append(row.date.toordinal() if row.date else 0)
+        self.discord_id.append(row.discord_id or 0)
+        self.colour.append(-1 if row.colour is None else row.colour)
+        for name, column in self.string_columns.items():
+            column.append(self.strings.add(getattr(row, name)))
+        return len(self.week) - 1
+
+    def row(self, index):
+        return StoredRow(self, index)
+
+    def rows(self, indexes):
+        return [StoredRow(self, index) for index in indexes]
+
+    def select(self, indexes):
+        return RowSequence(self, indexes)
+
+
+""" Memory report """
+
+
+FIRST_FRIDAY = dt.date(2023, 12, 8)
+HEADERS = ['Week', 'Date', 'Name', 'Discord', 'Song Name', 'Listen Link', 'Comment', 'Buy / Hypeddit', 'Week Image',
+           'Colour', 'Thumbnail Image']
+
+
+# Rows shaped like the real sheet: eight selections a week from a pool of returning artists
+def synthetic_records(count, seed=0):
+    rng = random.Random(seed)
+    artist_count = max(50, count // 40)
+    for i in range(count):
+        week = i // 8 + 1
+        friday = FIRST_FRIDAY + dt.timedelta(weeks=week - 1)
+        artist = rng.randrange(artist_count)
+        yield dict(zip(HEADERS, (
+            f"Week {week}",
+            f"{friday:%A} {friday:%d/%m/%y}",
+            f"Artist {artist}",
+            100000000000000000 + artist,
+            f"Track {i}",
+            f"https://soundcloud.com/artist-{artist}/track-{i}",
+            f"Week {week} selections, congrats all!",
+            f"https://hypeddit.com/track/{i}" if i % 3 == 0 else '',
+            f"https://i.imgur.com/week-{week}.png",
+            '#3618f6',
+            '',
+        )))
+
+
+def record_to_row(line, record):
+    week_label = record['Week']
+    return SimpleNamespace(
+        line=line, week=int(week_label.split()[1]), week_label=week_label,
+        date=FIRST_FRIDAY + dt.timedelta(weeks=int(week_label.split()[1]) - 1), date_label=record['Date'],
+        name=record['Name'], discord=str(record['Discord']), discord_id=record['Discord'],
+        song_name=record['Song Name'], listen_link=record['Listen Link'], comment=record['Comment'],
+        buy_link=record['Buy / Hypeddit'], week_image=record['Week Image'], colour=0x3618f6,
+        thumbnail_image=record['Thumbnail Image'],
+    )
+
+
+# Bytes still allocated once build() has returned its result
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def build_dict_rows(count):
+    return list(synthetic_records(count))
+
+
+def build_row_store(count):
+    store = RowStore()
+    for line, record in enumerate(synthetic_records(count), start=2):
+        store.append(record_to_row(line, record))
+    return store
+
+
+def memory_report(sizes=(10_000, 100_000, 1_000_000)):
+    print(f"{'rows':>10}  {'list of dicts':>14}  {'RowStore':>12}  {'saving':>7}  {'bytes/row':>15}")
+    for count in sizes:
+        dict_bytes = measure(lambda: build_dict_rows(count))
+        store_bytes = measure(lambda: build_row_store(count))
+        print(f"{count:>10,}  {dict_bytes / 2**20:>11.1f} MB  {store_bytes / 2**20:>9.1f} MB  "
+              f"{dict_bytes / store_bytes:>6.1f}x  {dict_bytes // count:>6} -> {store_bytes // count:<6}")
+
+
+if __name__ == "__main__":
+    memory_report([int(arg) for arg in sys.argv[1:]] or (10_000, 100_000, 1_000_000))
@@ -13,14 +13,15 @@ support join this Discord server - https://discord.gg/jqfyu6UfPS or visit here -
 import os
 import discord
 import gspread
-import requests
-from discord.ext.commands import CommandOnCooldown
+import aiohttp
 from discord.ext import commands, tasks
 from oauth2client.service_account import ServiceAccountCredentials
 from pytz import timezone
 from urllib.parse import urlparse, urlunparse
 import re
-from bs4 import BeautifulSoup
+from html.parser import HTMLParser
+import codecs
+import math
 import time
 import dotenv
 from discord.ui import View, Button
@@ -28,16 +29,28 @@ from dotenv import load_dotenv
 from discord import app_commands
 from datetime import datetime, timedelta
 import datetime as dt
-from collections import Counter
+from collections import Counter, OrderedDict, deque
+from urllib.parse import parse_qsl, urlencode
 import asyncio
 import json
-import traceback
-
-# Google Sheets API
+import io
+import random
+import hashlib
+import logging
+import logging.handlers
+import queue
+import atexit
+import functools
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from rowstore import RowStore, STRING_COLUMNS
+
+# Google Sheets API, connected in the background once the bot is online (see warm_up_sheets)
 scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-creds = ServiceAccountCredentials.from_json_keyfile_name("discordbot-uvrr-413076a6b997.json", scope)
-client = gspread.authorize(creds)
-sheet = client.open("DrumAndBassHeadsUK Spreadsheets").sheet1
+SHEETS_CREDENTIALS_FILE = "discordbot-uvrr-413076a6b997.json"
+SPREADSHEET_NAME = "DrumAndBassHeadsUK Spreadsheets"
+
+STARTED_AT = time.monotonic()
 
 load_dotenv()
 
@@ -46,24 +59,343 @@ link_emoji = "<:xdev_external_link:1293887507565379635>"
 # # Track warnings for ctx commands
 # user_warnings = {}
 
-# Track warning and cooldown for on_message function
-
-user_cooldowns = {}
-
-COOLDOWN_DURATION = 2
-
-# File to store assigned roles persistently
+# Token buckets shared by slash commands, prefix commands, page buttons and the "commands?" trigger. Each use spends
+# its cost from the member's bucket and from their server's, and is refused if either is short
+RATE_LIMIT_USER_CAPACITY = 4  # tokens
+RATE_LIMIT_USER_REFILL = 0.5  # tokens per second
+RATE_LIMIT_GUILD_CAPACITY = 40
+RATE_LIMIT_GUILD_REFILL = 4
+RATE_LIMIT_MAX_BUCKETS = 50000  # buckets are dropped once refilled, or oldest first past this many
+
+# Cost of each command by name; a leaderboard page costs more to build than a single week
+COMMAND_COSTS = {
+    'week': 1, 'lastweek': 1, 'thisweek': 1,
+    'profile': 2,
+    'season': 3, 'season1': 3, 'season2': 3,
+    'page': 1,  # a leaderboard or profile page button
+    'command_help': 1,  # the help embed sent for the "command_help" message trigger
+    'autoassign': 0, 'cachestats': 0,
+}
+DEFAULT_COMMAND_COST = 1
+
+# Words that make on_message reply without a command: trigger name -> regex, searched for anywhere in the lowercased
+# message, so write patterns in lower case. All of them are compiled into one pattern and a message is scanned once
+# however many there are. Names must be valid identifiers and patterns must not use numbered backreferences
+MESSAGE_TRIGGERS = {
+    'command_help': r'commands?\?',
+}
+TRIGGER_IGNORED_CHANNEL_IDS = set()  # channels where message triggers never fire
+
+# File to store assigned roles persistently. During a run it is rewritten after this many new entries or this many
+# seconds, whichever comes first, and once more when the run ends
 ROLE_TRACKING_FILE = "assigned_roles.json"
+ROLE_LEDGER_SAVE_EVERY = 50
+ROLE_LEDGER_SAVE_INTERVAL = 5
+
+# !autoassign adds roles a few members at a time; discord.py queues each request on its route's
+# rate-limit bucket, and requests Discord still rejects with a 429 or 5xx are retried with backoff
+ROLE_ASSIGN_CONCURRENCY = 4
+ROLE_ASSIGN_ATTEMPTS = 4
+ROLE_ASSIGN_BACKOFF = 1  # seconds, doubled on each retry
+ROLE_ASSIGN_PROGRESS_INTERVAL = 3  # seconds between progress edits
+ROLE_REPORT_MAX_MENTIONS = 20  # per list in the final report, to stay under Discord's message limit
+DISCORD_MESSAGE_LIMIT = 2000
 
 # log things
 LOG_CHANNEL_ID = 1353659260625621024
-LOG_FILE_PATH = 'nohup.out'
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()  # DEBUG adds per-row, per-request and per-command detail
+LOG_CONSOLE_LEVEL = os.getenv("LOG_CONSOLE_LEVEL", "WARNING").upper()  # what still reaches stdout / nohup.out
+LOG_CHANNEL_LEVEL = "INFO"
+LOG_FILE_PATH = 'sheetbot.log'
+LOG_MAX_BYTES = 5 * 1024 * 1024  # rotate the log file at this size
+LOG_BACKUP_COUNT = 5
+LOG_BUFFER_CHARS = 256 * 1024  # log output held for the next update to the log channel; older lines are dropped
+LOG_MESSAGE_LIMIT = 1900  # characters of log per message
+LOG_MAX_MESSAGES = 5  # per update; a bigger delta is posted as a file attachment instead
 
 # Configuration for retries and notification channel
 MAX_RETRIES = 5
 BASE_BACKOFF = 2  # seconds
 NOTIFICATION_CHANNEL_ID = 1200530700600889404
 
+# After this many Sheets reads in a row fail even with retries, stop calling Sheets for a while
+# and serve the last good snapshot instead
+SHEETS_BREAKER_THRESHOLD = 3
+SHEETS_BREAKER_COOLDOWN = 5 * 60  # seconds before a trial read is let through
+
+# Shared sheet snapshot, refreshed in the background every few minutes
+SHEET_REFRESH_MINUTES = float(os.getenv("SHEET_REFRESH_MINUTES", "5"))
+
+# Refreshes normally fetch only the rows appended since the last one; every Nth does a full download
+# to pick up edits and deletions further up the sheet
+SHEET_FULL_SYNC_EVERY = int(os.getenv("SHEET_FULL_SYNC_EVERY", "12"))
+
+# Startup warm-up: seconds between attempts while Google can't be reached, and how long a command sent before the
+# first snapshot is loaded waits for it before giving up
+SHEETS_CONNECT_RETRY = 30
+SHEETS_READY_TIMEOUT = 60
+
+# gspread is blocking, so every Sheets call runs on this bounded pool instead of the event loop
+SHEETS_MAX_WORKERS = int(os.getenv("SHEETS_MAX_WORKERS", "4"))
+sheets_executor = ThreadPoolExecutor(max_workers=SHEETS_MAX_WORKERS, thread_name_prefix="sheets")
+
+# Thumbnail scraping over a shared keep-alive connection pool
+THUMBNAIL_TIMEOUT = 8  # seconds per request
+THUMBNAIL_CONNECTIONS_PER_HOST = 4
+THUMBNAIL_MAX_CONNECTIONS = 20
+
+# Preview images live in <head>; stop reading a page after this many bytes either way
+THUMBNAIL_MAX_HEAD_BYTES = 256 * 1024
+THUMBNAIL_CHUNK_SIZE = 16 * 1024
+
+# Persistent cache of scraped thumbnails, keyed by normalised link
+THUMBNAIL_CACHE_FILE = "thumbnail_cache.json"
+THUMBNAIL_CACHE_MAX_ENTRIES = 2000
+THUMBNAIL_CACHE_TTL = 7 * 24 * 60 * 60  # seconds
+THUMBNAIL_CACHE_NEGATIVE_TTL = 6 * 60 * 60  # seconds, for pages with no image or that no longer exist
+THUMBNAIL_CACHE_FAILURE_TTL = 2 * 60  # seconds, for timeouts, dropped connections and server errors
+
+# This user's submissions are never ranked on the leaderboards
+EXCLUDED_USER_ID = '762317361822564412'
+
+# Seasons come from SEASONS_FILE when it exists, otherwise from DEFAULT_SEASONS. Each season covers a range of
+# weeks and/or dates, and a row counts towards every season whose range covers it. `role_threshold` is the number
+# of mentions !autoassign needs; `metadata_key` is the 'Season starts 4th December' value of its leaderboard row.
+# The file can also set "current_season", used for the "Season Rank" shown on profiles (default: the last season).
+SEASONS_FILE = "seasons.json"
+DEFAULT_SEASONS = [
+    {'number': 1, 'last_week': 49, 'role_threshold': 2, 'metadata_key': 'Season1'},
+    {'number': 2, 'start': '2024-12-03', 'end': '2025-12-02', 'role_threshold': 3, 'metadata_key': 'Season2'},
+]
+
+LEADERBOARD_USERS_PER_PAGE = 10
+PROFILE_ENTRIES_PER_PAGE = 5
+
+# Rendered leaderboard pages, shared by every paginated message and keyed by snapshot version
+PAGE_CACHE_SIZE = 200
+
+# Rendered /week, /lastweek and /thisweek embeds, keyed by the snapshot version in which the week last changed
+WEEK_EMBED_CACHE_SIZE = 100
+
+# Every column read by any command; a download missing any of them is rejected
+SHEET_HEADERS = ['Week', 'Date', 'Name', 'Discord', 'Song Name', 'Listen Link', 'Comment', 'Buy / Hypeddit',
+                 'Week Image', 'Colour', 'Thumbnail Image', 'Roles for Profile', 'Season starts 4th December',
+                 'NMF Leaderboard Thumbnail', 'Top right image', 'Leaderboard Colour', 'Autorole Seasons', 'Role Id']
+
+
+class StructuredFormatter(logging.Formatter):
+    """Log lines with any structured fields passed through `extra` (command, user, duration) as key=value pairs."""
+
+    FIELDS = ('command', 'user', 'guild', 'duration_ms')
+
+    def format(self, record):
+        record.fields = ''.join(f" {name}={getattr(record, name)}" for name in self.FIELDS if hasattr(record, name))
+        return super().format(record)
+
+
+class LogBuffer(logging.Handler):
+    """Holds the newest formatted log lines in memory until send_log posts them to the log channel."""
+
+    def __init__(self, max_chars, level):
+        super().__init__(level)
+        self.max_chars = max_chars
+        self.lines = deque()
+        self.chars = 0
+        self.dropped = 0
+
+    def emit(self, record):
+        line = self.format(record)
+        self.lines.append(line)
+        self.chars += len(line) + 1
+        self.trim()
+
+    def trim(self):
+        while self.chars > self.max_chars and len(self.lines) > 1:
+            self.chars -= len(self.lines.popleft()) + 1
+            self.dropped += 1
+
+    # Put text that could not be posted back in front of anything logged since, to go out with the next post
+    def requeue(self, text):
+        lines = text.split('\n')
+        self.acquire()
+        try:
+            self.lines.extendleft(reversed(lines))
+            self.chars += sum(len(line) + 1 for line in lines)
+            self.trim()
+        finally:
+            self.release()
+
+    # Everything logged since the last call, or '' if nothing was
+    def drain(self):
+        self.acquire()
+        try:
+            lines, dropped = self.lines, self.dropped
+            self.lines, self.chars, self.dropped = deque(), 0, 0
+        finally:
+            self.release()
+        text = '\n'.join(lines)
+        if dropped:
+            text = f"[{dropped} older lines dropped]\n" + text
+        return text
+
+
+log_buffer = LogBuffer(LOG_BUFFER_CHARS, LOG_CHANNEL_LEVEL)
+
+
+# Loggers only put records on a queue; a listener thread formats them and does the file and console writes,
+# so logging never blocks the event loop
+def setup_logging():
+    formatter = StructuredFormatter('%(asctime)s %(levelname)s %(name)s%(fields)s: %(message)s')
+    file_handler = logging.handlers.RotatingFileHandler(LOG_FILE_PATH, maxBytes=LOG_MAX_BYTES,
+                                                        backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(LOG_CONSOLE_LEVEL)
+    handlers = (file_handler, console_handler, log_buffer)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    # discord.py's own DEBUG output is gateway chatter; keep it at INFO whatever the bot's level
+    logging.getLogger('discord').setLevel(max(logging.INFO, root.level))
+    listener.start()
+    atexit.register(listener.stop)
+
+
+setup_logging()
+log = logging.getLogger('sheetbot')
+
+
+# Structured fields for a log record about a slash or prefix command, timed from when it was sent
+def command_fields(source):
+    if isinstance(source, discord.Interaction):
+        user, guild, started = source.user, source.guild, source.created_at
+    else:
+        user, guild, started = source.author, source.guild, source.message.created_at
+    command = source.command.qualified_name if source.command else None
+    duration = (datetime.now(dt.timezone.utc) - started).total_seconds() * 1000
+    return {'command': command, 'user': user.id, 'guild': guild.id if guild else None,
+            'duration_ms': round(duration)}
+
+
+class RateLimitExceeded(commands.CheckFailure):
+    """Raised for a prefix command whose cost the rate limiter refused."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Rate limited, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class TokenBucketLimiter:
+    """Token buckets per user and per guild, refilled continuously and evicted once they are full again.
+
+    A bucket that has refilled to capacity behaves exactly like one that was never created, so buckets are kept in
+    order of last use and dropped from the oldest end as soon as they are full; memory follows the number of members
+    active in the last few seconds rather than everyone who has ever used the bot.
+    """
+
+    def __init__(self, limits, max_buckets):
+        self.limits = limits  # scope -> (capacity, refill per second)
+        self.max_buckets = max_buckets
+        self.buckets = OrderedDict()  # (scope, id) -> (tokens, monotonic time of the last update)
+        self.warned = OrderedDict()  # user ID -> monotonic time until which they have been told to wait
+        self.allowed = 0
+        self.refused = 0
+
+    def level(self, key, now):
+        capacity, refill = self.limits[key[0]]
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            return capacity
+        tokens, updated = bucket
+        return min(capacity, tokens + (now - updated) * refill)
+
+    def evict(self, now):
+        while self.buckets:
+            key = next(iter(self.buckets))
+            if len(self.buckets) <= self.max_buckets and self.level(key, now) < self.limits[key[0]][0]:
+                break
+            del self.buckets[key]
+
+    def acquire(self, user_id, guild_id, cost):
+        """Spend `cost` from the user's bucket and the guild's; returns 0 if allowed, else seconds to wait."""
+        now = time.monotonic()
+        self.evict(now)
+        keys = [('user', user_id)] if guild_id is None else [('user', user_id), ('guild', guild_id)]
+        levels = [self.level(key, now) for key in keys]
+        retry_after = max((cost - level) / self.limits[key[0]][1] for key, level in zip(keys, levels))
+        if retry_after > 0:
+            self.refused += 1
+            return retry_after
+        for key, level in zip(keys, levels):
+            self.buckets[key] = (level - cost, now)
+            self.buckets.move_to_end(key)
+        self.allowed += 1
+        return 0
+
+    # Whether to tell a refused user how long to wait: once per refusal, not on every retry within it
+    def should_warn(self, user_id, retry_after):
+        now = time.monotonic()
+        while self.warned and next(iter(self.warned.values())) <= now:
+            self.warned.popitem(last=False)
+        if self.warned.get(user_id, 0) > now:
+            return False
+        self.warned[user_id] = now + retry_after
+        self.warned.move_to_end(user_id)
+        return True
+
+
+rate_limiter = TokenBucketLimiter({'user': (RATE_LIMIT_USER_CAPACITY, RATE_LIMIT_USER_REFILL),
+                                   'guild': (RATE_LIMIT_GUILD_CAPACITY, RATE_LIMIT_GUILD_REFILL)},
+                                  RATE_LIMIT_MAX_BUCKETS)
+
+
+# Spend a command's cost from the shared limiter; returns 0 if it may run, else seconds until it could
+def rate_limit(name, user, guild):
+    cost = COMMAND_COSTS.get(name, DEFAULT_COMMAND_COST)
+    if cost <= 0:
+        return 0
+    retry_after = rate_limiter.acquire(user.id, guild.id if guild else None, cost)
+    if retry_after:
+        log.debug("Rate limited", extra={'command': name, 'user': user.id, 'guild': guild.id if guild else None})
+    return retry_after
+
+
+async def send_rate_limited(interaction, retry_after):
+    await interaction.response.send_message(f"Slow down! Try again in {math.ceil(retry_after)}s.", ephemeral=True)
+
+
+class RateLimitedTree(app_commands.CommandTree):
+    """Command tree that charges every slash command to the shared rate limiter before running it."""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.type is not discord.InteractionType.application_command:
+            return True
+        name = interaction.command.qualified_name if interaction.command else None
+        retry_after = rate_limit(name, interaction.user, interaction.guild)
+        if retry_after:
+            await send_rate_limited(interaction, retry_after)
+            return False
+        return True
+
+
+class SheetBot(commands.Bot):
+    """The bot, saving what it keeps on disk and closing its HTTP session when it shuts down."""
+
+    async def close(self):
+        await super().close()
+        # The save loop only runs every 10 minutes, so whatever was scraped since then would be lost
+        try:
+            thumbnail_cache.save()
+        except Exception as e:
+            log.error("Error saving thumbnail cache: %s", e)
+        if http_session is not None and not http_session.closed:
+            await http_session.close()
+
+
 intents = discord.Intents.default()
 intents.messages = True
 intents.message_content = True
@@ -71,39 +403,896 @@ intents.guilds = True
 intents.dm_messages = True
 intents.members = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = SheetBot(command_prefix="!", intents=intents, tree_cls=RateLimitedTree)
+
+
+@bot.event
+async def setup_hook():
+    # One handler for the paging buttons on every leaderboard and profile message, old ones included
+    bot.add_dynamic_items(PageButton)
+
 
 @bot.event
 async def on_ready():
-    print(f'Logged in as {bot.user.name}')
+    log.info("Logged in as %s, %.1fs after start", bot.user.name, time.monotonic() - STARTED_AT)
+    start_sheets_warm_up()
     try:
         synced = await bot.tree.sync()
-        print(f'Synced {len(synced)} command(s)')
-    except Exception as e:
-        print(e)
-    send_log.start()
+        log.info("Synced %d command(s)", len(synced))
+    except Exception:
+        log.exception("Could not sync the command tree")
+    if not send_log.is_running():
+        send_log.start()
+    if not save_thumbnail_cache.is_running():
+        save_thumbnail_cache.start()
 """Helper Functions"""
 
 
+# Split text into pieces of at most `limit` characters, breaking at newlines where possible
+def split_log_text(text, limit=LOG_MESSAGE_LIMIT):
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind('\n', 0, limit)
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip('\n')
+    if text:
+        chunks.append(text)
+    return chunks
+
+
+# Whatever is not posted goes back into the buffer, so a failed send is retried by the next one
+async def post_log_update(channel, text):
+    chunks = split_log_text(text)
+    if len(chunks) <= LOG_MAX_MESSAGES:
+        for i, chunk in enumerate(chunks):
+            try:
+                await channel.send(f'Log Update:\n{chunk}')
+            except Exception:
+                log_buffer.requeue('\n'.join(chunks[i:]))
+                raise
+    else:
+        log_file = discord.File(io.BytesIO(text.encode('utf-8')), filename='log_update.txt')
+        try:
+            await channel.send(f'Log Update: {len(text)} characters attached', file=log_file)
+        except Exception:
+            log_buffer.requeue(text)
+            raise
+
+
 @tasks.loop(minutes=5)
 async def send_log():
     try:
         channel = bot.get_channel(LOG_CHANNEL_ID)
         if channel is not None:
-            with open(LOG_FILE_PATH, 'r') as log_file:
-                log_content = log_file.read()
-                if len(log_content) > 1900:
-                    log_content = log_content[-1900:]
-                await channel.send(f'Log Update:\n{log_content}')
+            log_content = log_buffer.drain()
+            if log_content.strip():
+                await post_log_update(channel, log_content)
         else:
-            print(f'Channel with ID {LOG_CHANNEL_ID} not found.')
+            log.warning("Channel with ID %s not found.", LOG_CHANNEL_ID)
+    except Exception:
+        log.exception("Error sending log")
+
+
+# Convert a colour value (e.g. "#3618f6") into an int, or None if it isn't a valid hex colour
+def parse_colour(value):
+    try:
+        colour = int(str(value).strip().lstrip('#'), 16)
+    except ValueError:
+        return None
+    return colour if 0 <= colour <= 0xFFFFFF else None
+
+
+class SheetRow:
+    """One submission from the sheet, parsed once when the snapshot is ingested."""
+
+    __slots__ = ('line', 'week', 'week_label', 'date', 'date_label', 'name', 'discord', 'discord_id', 'song_name',
+                 'listen_link', 'comment', 'buy_link', 'week_image', 'colour', 'thumbnail_image')
+
+    def __init__(self, line, record):
+        self.line = line  # row number in the sheet, for error reports
+
+        self.week_label = str(record.get('Week', '')).strip()
+        try:
+            self.week = int(self.week_label.replace('Week ', '').strip())
+        except ValueError:
+            raise ValueError(f"unreadable week {self.week_label!r}")
+
+        # A row with an unreadable date still counts towards week-based totals; it just can't be found by date
+        self.date_label = str(record.get('Date', '')).strip()
+        date_val = parse_date(self.date_label)
+        self.date = date_val.date() if date_val else None
+
+        # Non-members are listed by name, so the Discord cell is not always an ID
+        self.discord = str(record.get('Discord', '')).strip()
+        self.discord_id = int(self.discord) if self.discord.isdigit() else None
+
+        self.name = str(record.get('Name', ''))
+        self.song_name = str(record.get('Song Name', ''))
+        self.listen_link = str(record.get('Listen Link', '')).strip()
+        self.comment = str(record.get('Comment', ''))
+        self.buy_link = str(record.get('Buy / Hypeddit', '')).strip()
+        self.week_image = str(record.get('Week Image', '')).strip()
+        self.thumbnail_image = str(record.get('Thumbnail Image', '')).strip()
+        self.colour = parse_colour(record.get('Colour', ''))
+
+
+class Season:
+    """One NMF season: the weeks and/or dates it covers, its autoassign threshold and its leaderboard metadata row."""
+
+    def __init__(self, number, role_threshold, metadata_key=None, first_week=None, last_week=None, start=None,
+                 end=None):
+        self.number = number
+        self.role_threshold = role_threshold
+        self.metadata_key = metadata_key or f"Season{number}"
+        self.first_week = first_week
+        self.last_week = last_week
+        self.start = start  # dt.date
+        self.end = end
+
+    @classmethod
+    def from_config(cls, entry):
+        def week(key):
+            return int(entry[key]) if entry.get(key) is not None else None
+
+        def date(key):
+            return dt.date.fromisoformat(entry[key]) if entry.get(key) else None
+        return cls(int(entry['number']), int(entry['role_threshold']), entry.get('metadata_key'),
+                   week('first_week'), week('last_week'), date('start'), date('end'))
+
+    # Takes the raw RowStore columns so the season pass never builds row objects; a date ordinal of 0 means the
+    # row's date was unreadable, so it only belongs to seasons bounded by week alone
+    def contains(self, week, date_ordinal):
+        if not date_ordinal and (self.start is not None or self.end is not None):
+            return False
+        return ((self.first_week is None or week >= self.first_week)
+                and (self.last_week is None or week <= self.last_week)
+                and (self.start is None or date_ordinal >= self.start.toordinal())
+                and (self.end is None or date_ordinal <= self.end.toordinal()))
+
+    def describe(self):
+        parts = []
+        if self.first_week is not None or self.last_week is not None:
+            parts.append(f"Weeks {self.first_week or 1}-{self.last_week}" if self.last_week is not None
+                         else f"from Week {self.first_week}")
+        if self.start is not None or self.end is not None:
+            parts.append(" to ".join(f"{day:%d/%m/%y}" for day in (self.start, self.end) if day is not None))
+        return ", ".join(parts) or "all weeks"
+
+
+# Raises KeyError, TypeError, ValueError or AttributeError for anything malformed
+def parse_seasons(config):
+    seasons = sorted((Season.from_config(entry) for entry in config['seasons']), key=lambda season: season.number)
+    seasons = {season.number: season for season in seasons}
+    if not seasons:
+        raise ValueError("no seasons are defined")
+    current = int(config.get('current_season', max(seasons)))
+    if current not in seasons:
+        raise ValueError(f"current_season {current} is not one of the defined seasons")
+    return seasons, current
+
+
+def load_seasons(path):
+    config = {'seasons': DEFAULT_SEASONS}
+    try:
+        with open(path, 'r') as seasons_file:
+            config = json.load(seasons_file)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        log.error("Could not read %s, using the default seasons: %s", path, e)
+
+    try:
+        return parse_seasons(config)
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        log.error("Invalid season definition in %s, using the default seasons: %s", path, e)
+        return parse_seasons({'seasons': DEFAULT_SEASONS})
+
+
+SEASONS, CURRENT_SEASON = load_seasons(SEASONS_FILE)
+
+
+class SeasonLeaderboard:
+    """Sorted mention counts for one season, rebuilt only when the sheet rows change."""
+
+    def __init__(self, season, mention_counts, user_names, metadata):
+        self.season = season
+
+        # Leaderboard images and colour from the season's metadata row, or None if the sheet has none
+        self.metadata = metadata
+
+        self.mention_counts = mention_counts  # every Discord cell in the season, unranked users included
+        self.user_names = user_names
+        sorted_leaderboard = sorted(mention_counts.items(), key=lambda x: x[1], reverse=True)
+        self.entries = [item for item in sorted_leaderboard if item[0] != EXCLUDED_USER_ID]
+
+    # Discord IDs with at least `threshold` mentions this season
+    def eligible_user_ids(self, threshold):
+        return [int(uid) for uid, count in self.mention_counts.items() if uid.isdigit() and count >= threshold]
+
+    @property
+    def thumbnail(self):
+        return self.metadata.get('NMF Leaderboard Thumbnail', '')
+
+    @property
+    def top_right_image(self):
+        return self.metadata.get('Top right image', '')
+
+    @property
+    def colour(self):
+        return self.metadata.get('Leaderboard Colour', '#000000')
+
+
+class SheetCache:
+    """Process-wide snapshot of the sheet rows shared by every command."""
+
+    def __init__(self):
+        self.rows = None  # RowStore of the submissions, in sheet order
+        self.headers = []
+        self.synced_rows = 0  # data rows below the header already ingested, blank ones included
+        self.last_values = None  # cell values of the last synced row (the header row before any data)
+        self.syncs_since_full = 0
+        self.revision = None  # spreadsheet modifiedTime when the snapshot was last synced
+        self.full_revision = None  # spreadsheet modifiedTime at the last full download
+        self.skipped_refreshes = 0  # refreshes skipped because the probe showed no change
+        self.fingerprint = None  # running SHA-1 over every row ingested, to spot edits on a full download
+        self.fetched_at = None
+        self.stale = False  # the last refresh failed, so commands are being served an older snapshot
+        self.version = 0
+        self.quarantined = []  # (sheet row, problem) for rows skipped, or kept with a fallback, at ingest
+        self.season_metadata = {}  # 'SeasonN' -> leaderboard images and colour
+        self.autorole_roles = {}  # season number -> role ID
+        self.week_index = {}  # week number -> row indexes
+        self.date_index = {}  # Friday date ordinal -> row indexes
+        self.week_digests = {}  # ('week', number) or ('date', ordinal) -> digest of those rows, kept across reloads
+        self.week_versions = {}  # same keys -> snapshot version in which those rows last changed
+        self.leaderboards = {}  # season number -> SeasonLeaderboard
+        self.user_index = {}  # Discord ID -> that user's row indexes, newest first
+        self.overall_ranks = {}  # Discord ID -> all-time rank
+        self.season_ranks = {}  # Discord ID -> current season rank
+        self.awarded_role_ids = set()  # every role ID listed under 'Roles for Profile'
+
+    # Pad or trim a row of cell values to the header width, so full and tail downloads hash the same
+    def normalise_values(self, row_values):
+        width = len(self.headers)
+        return (list(row_values) + [''] * width)[:width]
+
+    # Load a full download (header row first); returns False when it matched the current snapshot
+    def load_full(self, values):
+        self.fetched_at = datetime.now(dt.timezone.utc)
+        self.syncs_since_full = 0
+
+        headers = values[0] if values else []
+        missing = [header for header in SHEET_HEADERS if header not in headers]
+        if missing:
+            raise gspread.exceptions.GSpreadException(f"Sheet is missing expected column(s): {', '.join(missing)}")
+
+        self.headers = headers
+        data_rows = [self.normalise_values(row_values) for row_values in values[1:]]
+        fingerprint = hashlib.sha1(repr(headers).encode())
+        for row_values in data_rows:
+            fingerprint.update(repr(row_values).encode())
+        if self.fingerprint is not None and fingerprint.digest() == self.fingerprint.digest():
+            return False
+
+        self.fingerprint = fingerprint
+        self.rows = RowStore()
+        self.synced_rows = 0
+        self.last_values = self.normalise_values(headers)
+        self.quarantined = []
+        self.season_metadata = {}
+        self.autorole_roles = {}
+        self.awarded_role_ids = set()
+        self.week_index = {}
+        self.date_index = {}
+        self.apply(data_rows)
+        return True
+
+    # Append the rows added below the last synced row; returns False when there were none
+    def load_tail(self, values):
+        self.fetched_at = datetime.now(dt.timezone.utc)
+        self.syncs_since_full += 1
+
+        data_rows = [self.normalise_values(row_values) for row_values in values]
+        while data_rows and not any(data_rows[-1]):
+            data_rows.pop()
+        if not data_rows:
+            return False
+
+        for row_values in data_rows:
+            self.fingerprint.update(repr(row_values).encode())
+        self.apply(data_rows)
+        return True
+
+    # The probe showed nothing changed, so neither download nor rebuild anything
+    def mark_unchanged(self):
+        self.fetched_at = datetime.now(dt.timezone.utc)
+        self.syncs_since_full += 1
+        self.skipped_refreshes += 1
+
+    # A1 range covering the last synced row and everything below it
+    def tail_range(self):
+        last_column = re.sub(r'\d+$', '', gspread.utils.rowcol_to_a1(1, len(self.headers)))
+        return f"A{self.synced_rows + 1}:{last_column}"
+
+    # The tail starts with the last synced row, which must still hold what was ingested there; anything else means
+    # rows above the bottom were inserted, moved or deleted. Returns the rows below it, or None on a mismatch
+    def tail_rows(self, values):
+        anchor = self.normalise_values(values[0] if values else [])
+        if anchor != self.last_values:
+            return None
+        return values[1:]
+
+    def apply(self, data_rows):
+        first_index = len(self.rows)
+        self.ingest(data_rows)
+        self.index_rows(first_index)
+        self.track_week_changes(first_index)
+        self.build_leaderboards()
+        self.build_profile_indexes()
+        self.version += 1
+
+    # Parse rows of cell values into the RowStore and pull out the side tables kept in the same sheet
+    def ingest(self, data_rows):
+        rows = self.rows
+        quarantined = []
+        season_metadata = self.season_metadata
+        autorole_roles = self.autorole_roles
+        awarded_role_ids = self.awarded_role_ids
+
+        first_line = self.synced_rows + 2  # the header is row 1
+        for line, row_values in enumerate(data_rows, start=first_line):
+            record = dict(zip(self.headers, row_values))
+            season_key = record.get('Season starts 4th December')
+            if season_key and season_key not in season_metadata:
+                season_metadata[season_key] = {
+                    'NMF Leaderboard Thumbnail': record.get('NMF Leaderboard Thumbnail', ''),
+                    'Top right image': record.get('Top right image', ''),
+                    'Leaderboard Colour': record.get('Leaderboard Colour', '#000000'),
+                }
+
+            if record.get('Autorole Seasons'):
+                try:
+                    autorole_roles[int(record['Autorole Seasons'])] = int(record.get('Role Id'))
+                except (TypeError, ValueError):
+                    quarantined.append((line, f"invalid autorole season/role ID {record.get('Role Id')!r}"))
+
+            roles = record.get('Roles for Profile', "")
+            if roles:
+                awarded_role_ids.update(int(x.strip()) for x in roles.split(',') if x.strip().isdigit())
+
+            # Rows that only carry the side tables have no submission
+            if not (record.get('Week') or record.get('Date') or record.get('Discord')):
+                continue
+            try:
+                row = SheetRow(line, record)
+            except ValueError as e:
+                quarantined.append((line, str(e)))
+                continue
+            if row.date is None:
+                quarantined.append((line, f"unreadable date {row.date_label!r}, counted by week only"))
+            if record.get('Colour') and row.colour is None:
+                quarantined.append((line, f"invalid colour {record.get('Colour')!r}, using the default"))
+            rows.append(row)
+
+        # Reported once when the rows are ingested rather than on every command
+        if quarantined:
+            log.warning("Sheet ingest: %d problem row(s) out of %d", len(quarantined), len(data_rows))
+            for line, problem in quarantined:
+                log.warning("  row %d: %s", line, problem)
+
+        self.synced_rows += len(data_rows)
+        if data_rows:
+            self.last_values = data_rows[-1]
+        self.quarantined.extend(quarantined)
+
+    # Extended as rows are ingested so week and date lookups never scan the sheet
+    def index_rows(self, first_index):
+        for index in range(first_index, len(self.rows)):
+            self.week_index.setdefault(self.rows.week[index], array('I')).append(index)
+            if self.rows.date[index]:
+                self.date_index.setdefault(self.rows.date[index], array('I')).append(index)
+
+    # Re-hash the weeks that gained rows (every week on a full download) so only edited weeks get a new version
+    def track_week_changes(self, first_index):
+        rows = self.rows
+        changed = {('week', rows.week[index]) for index in range(first_index, len(rows))}
+        changed.update(('date', rows.date[index]) for index in range(first_index, len(rows)) if rows.date[index])
+        if first_index == 0:
+            for key in set(self.week_digests) - changed:
+                del self.week_digests[key]
+                del self.week_versions[key]
+
+        for key in changed:
+            indexes = (self.week_index if key[0] == 'week' else self.date_index)[key[1]]
+            content = [(row.line, row.week, row.colour, *(getattr(row, name) for name in STRING_COLUMNS))
+                       for row in rows.select(indexes)]
+            digest = hashlib.sha1(repr(content).encode()).digest()
+            if self.week_digests.get(key) != digest:
+                self.week_digests[key] = digest
+                self.week_versions[key] = self.version + 1
+
+    # One pass over the rows assigns each to its season(s) and counts the mentions for every season at once
+    def build_leaderboards(self):
+        started = time.perf_counter()
+        mention_counts = {number: {} for number in SEASONS}
+        user_names = {number: {} for number in SEASONS}
+        strings = self.rows.strings
+        discord_column = self.rows.string_columns['discord']
+        name_column = self.rows.string_columns['name']
+        for index, (week, date_ordinal) in enumerate(zip(self.rows.week, self.rows.date)):
+            for number, season in SEASONS.items():
+                if season.contains(week, date_ordinal):
+                    uid = strings[discord_column[index]]
+                    counts = mention_counts[number]
+                    counts[uid] = counts.get(uid, 0) + 1
+                    user_names[number][uid] = strings[name_column[index]]
+
+        self.leaderboards = {
+            number: SeasonLeaderboard(number, mention_counts[number], user_names[number],
+                                      self.season_metadata.get(season.metadata_key))
+            for number, season in SEASONS.items()
+        }
+        log.info("Rebuilt %d season leaderboard(s) in %.1f ms", len(SEASONS), (time.perf_counter() - started) * 1000)
+
+    # Everything /profile needs, so a profile is a handful of dictionary lookups
+    def build_profile_indexes(self):
+        user_index = {}
+        overall_mention_counts = {}
+        strings = self.rows.strings
+        for index, string_id in enumerate(self.rows.string_columns['discord']):
+            uid = strings[string_id]
+            user_index.setdefault(uid, []).append(index)
+            if uid and uid != EXCLUDED_USER_ID:
+                overall_mention_counts[uid] = overall_mention_counts.get(uid, 0) + 1
+
+        dates = self.rows.date
+        for uid, indexes in user_index.items():
+            user_index[uid] = array('I', sorted(indexes, key=dates.__getitem__, reverse=True))
+
+        sorted_overall = sorted(overall_mention_counts.items(), key=lambda x: x[1], reverse=True)
+        self.overall_ranks = {uid: idx + 1 for idx, (uid, _) in enumerate(sorted_overall)}
+
+        # The current season's leaderboard is already sorted; blank Discord cells are not ranked
+        season_entries = [uid for uid, _ in self.leaderboards[CURRENT_SEASON].entries if uid]
+        self.season_ranks = {uid: idx + 1 for idx, uid in enumerate(season_entries)}
+
+        self.user_index = user_index
+
+
+sheet_cache = SheetCache()
+
+
+# Run a blocking gspread call on the Sheets thread pool and await its result
+async def run_sheets_call(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(sheets_executor, functools.partial(func, *args, **kwargs))
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one in-flight task whose result they all share."""
+
+    def __init__(self):
+        self.in_flight = {}  # key -> running task
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key, func, *args):
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args))
+            self.in_flight[key] = task
+            task.add_done_callback(functools.partial(self.finished, key))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        # Shielded so one caller giving up does not cancel the fetch for everyone else
+        return await asyncio.shield(task)
+
+    def finished(self, key, task):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        # Mark the exception as retrieved even if every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+
+fetch_flights = SingleFlight()
+
+
+class SheetsUnavailable(Exception):
+    """Raised when the sheet cannot be read and there is no snapshot to fall back on."""
+
+
+class CircuitBreaker:
+    """Stops calling a failing service after repeated failures, then lets a trial call through after a cooldown."""
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self):
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = self.HALF_OPEN
+        return self.state != self.OPEN
+
+    # Both return True when the breaker opened or closed, i.e. when it is worth telling someone
+    def record_success(self):
+        self.failures = 0
+        changed = self.state != self.CLOSED
+        self.state = self.CLOSED
+        return changed
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+            # A failed trial just restarts the cooldown; only the first trip is news
+            changed = self.state == self.CLOSED
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            return changed
+        return False
+
+
+sheets_breaker = CircuitBreaker(SHEETS_BREAKER_THRESHOLD, SHEETS_BREAKER_COOLDOWN)
+
+
+# Quota 429s, Google server errors and network failures are worth another try; anything else is a real error
+def is_transient_sheets_error(error):
+    if isinstance(error, gspread.exceptions.APIError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, (OSError, TimeoutError))
+
+
+async def announce_sheets_state(message):
+    log.warning(message)
+    channel = bot.get_channel(NOTIFICATION_CHANNEL_ID)
+    if channel:
+        try:
+            await channel.send(message)
+        except discord.HTTPException as e:
+            log.error("Could not post to the notification channel: %s", e)
+
+
+# Every Sheets data read goes through here: retried with jittered exponential backoff, behind the breaker
+async def read_sheet(func, *args):
+    if not sheets_breaker.allow():
+        raise SheetsUnavailable("Google Sheets is unavailable right now, please try again in a few minutes.")
+
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            result = await run_sheets_call(func, *args)
+        except Exception as e:
+            if not is_transient_sheets_error(e):
+                raise
+            if attempt == MAX_RETRIES:
+                if sheets_breaker.record_failure():
+                    await announce_sheets_state(
+                        f"Google Sheets reads are failing ({e}). Serving the last good snapshot and pausing "
+                        f"reads for {SHEETS_BREAKER_COOLDOWN // 60} minutes at a time until it recovers.")
+                raise
+            delay = BASE_BACKOFF * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            log.warning("Sheets read failed (%s), retry %d/%d in %.1fs", e, attempt, MAX_RETRIES - 1, delay)
+            await asyncio.sleep(delay)
+        else:
+            if sheets_breaker.record_success():
+                await announce_sheets_state("Google Sheets reads have recovered; the snapshot is up to date again.")
+            return result
+
+
+sheet = None  # the submissions worksheet, opened by connect_sheet
+sheets_ready = asyncio.Event()  # set once the first snapshot is loaded
+sheets_warm_up = None
+
+
+# Blocking: reads the service account key, authorises and opens the worksheet (two Google round trips)
+def connect_sheet():
+    creds = ServiceAccountCredentials.from_json_keyfile_name(SHEETS_CREDENTIALS_FILE, scope)
+    client = gspread.authorize(creds)
+    return client.open(SPREADSHEET_NAME).sheet1
+
+
+# Runs once the gateway is up: connect, load the first snapshot, then hand over to the refresh loop. Any failure,
+# including Google being down, is retried here rather than crashing the process
+async def warm_up_sheets():
+    global sheet
+    while True:
+        try:
+            if sheet is None:
+                sheet = await run_sheets_call(connect_sheet)
+                log.info("Connected to Google Sheets %.1fs after start", time.monotonic() - STARTED_AT)
+            rows = await refresh_sheet_cache(full=True)
+            break
+        except Exception as e:
+            log.error("Sheets warm-up failed, retrying in %ds: %s", SHEETS_CONNECT_RETRY, e)
+            await asyncio.sleep(SHEETS_CONNECT_RETRY)
+    sheets_ready.set()
+    log.info("Ready: %d sheet rows loaded %.1fs after start", len(rows), time.monotonic() - STARTED_AT)
+    if not refresh_sheet_loop.is_running():
+        refresh_sheet_loop.start()
+
+
+# on_ready fires again after every reconnect, but the warm-up only ever runs once
+def start_sheets_warm_up():
+    global sheets_warm_up
+    if sheets_warm_up is None:
+        sheets_warm_up = asyncio.create_task(warm_up_sheets())
+
+
+# Drive's modifiedTime for the spreadsheet, which changes on any edit; one cheap metadata request
+def probe_sheet_revision():
+    return sheet.spreadsheet.get_lastUpdateTime()
+
+
+async def full_sheet_sync(revision):
+    values = await read_sheet(sheet.get_all_values)
+    sheet_cache.load_full(values)
+    sheet_cache.revision = sheet_cache.full_revision = revision
+    return sheet_cache.rows
+
+
+# Concurrent refreshes (a burst of commands on a cold cache, or one racing the refresh loop) share one sync
+async def refresh_sheet_cache(full=False):
+    return await fetch_flights.do(('sheet', full), sync_sheet_cache, full)
+
+
+# Full and tail syncs are separate flights but both rewrite sheet_cache, so they take turns
+sheet_sync_lock = asyncio.Lock()
+
+
+# A failed refresh leaves the previous snapshot in place, marked stale until a refresh succeeds
+async def sync_sheet_cache(full=False):
+    async with sheet_sync_lock:
+        try:
+            rows = await sync_sheet_rows(full)
+        except Exception:
+            sheet_cache.stale = sheet_cache.rows is not None
+            raise
+        sheet_cache.stale = False
+        return rows
+
+
+async def sync_sheet_rows(full):
+    revision = None
+    # The probe is best effort and skipped entirely while the breaker is open
+    if sheets_breaker.allow():
+        try:
+            revision = await run_sheets_call(probe_sheet_revision)
+        except Exception as e:
+            # Without a probe every refresh just syncs as usual
+            log.warning("Sheet change probe failed: %s", e)
+
+    # Full downloads reconcile edits further up the sheet, but only if it changed since the last one
+    full_due = sheet_cache.syncs_since_full >= SHEET_FULL_SYNC_EVERY and (
+        revision is None or revision != sheet_cache.full_revision)
+    if full or sheet_cache.rows is None or full_due:
+        return await full_sheet_sync(revision)
+
+    if revision is not None and revision == sheet_cache.revision:
+        sheet_cache.mark_unchanged()
+        return sheet_cache.rows
+
+    if sheet_cache.skipped_refreshes:
+        log.info("Sheet changed; %d refresh(es) skipped so far while it was unchanged",
+                 sheet_cache.skipped_refreshes)
+
+    # New rows are appended at the bottom, so normally only the tail needs fetching
+    try:
+        values = await read_sheet(sheet.get_values, sheet_cache.tail_range())
+    except gspread.exceptions.APIError as e:
+        # Quota and server errors have already been retried and would fail a full download the same way
+        if is_transient_sheets_error(e):
+            raise
+        # e.g. the range runs past the end of the grid; a full download always works
+        log.warning("Tail sync failed, falling back to a full download: %s", e)
+        return await full_sheet_sync(revision)
+
+    values = sheet_cache.tail_rows(values)
+    if values is None:
+        # Appending now would ingest a shifted row a second time
+        log.info("Rows above the tail moved, falling back to a full download")
+        return await full_sheet_sync(revision)
+    if not sheet_cache.load_tail(values) and revision is not None:
+        # The sheet changed but nothing was appended, so the edit is further up
+        return await full_sheet_sync(revision)
+    sheet_cache.revision = revision
+    return sheet_cache.rows
+
+
+# Commands read from the shared snapshot; one sent during startup waits for the warm-up to load it
+async def get_sheet_rows():
+    if not sheets_ready.is_set():
+        try:
+            await asyncio.wait_for(sheets_ready.wait(), SHEETS_READY_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise SheetsUnavailable("I'm still connecting to Google Sheets, please try again in a minute.") from None
+    return sheet_cache.rows
+
+
+# Message content to send alongside sheet data while refreshes are failing, or None when it is current
+def stale_notice():
+    if not sheet_cache.stale:
+        return None
+    return (f"Google Sheets can't be reached right now, so this is the data from "
+            f"{discord.utils.format_dt(sheet_cache.fetched_at, 'R')}.")
+
+
+async def get_week_rows(week_number):
+    await get_sheet_rows()
+    return sheet_cache.rows.rows(sheet_cache.week_index.get(week_number, ()))
+
+
+async def get_date_rows(date):
+    await get_sheet_rows()
+    return sheet_cache.rows.rows(sheet_cache.date_index.get(date.toordinal(), ()))
+
+
+async def get_season_leaderboard(season):
+    await get_sheet_rows()
+    return sheet_cache.leaderboards[season]
+
+
+async def get_profile_data(discord_id):
+    await get_sheet_rows()
+
+    # Users with no mentions rank just below everyone who has one
+    if discord_id == EXCLUDED_USER_ID:
+        overall_rank = season_rank = '-'
+    else:
+        overall_rank = sheet_cache.overall_ranks.get(discord_id, len(sheet_cache.overall_ranks) + 1)
+        season_rank = sheet_cache.season_ranks.get(discord_id, len(sheet_cache.season_ranks) + 1)
+
+    return {
+        'submissions': sheet_cache.rows.select(sheet_cache.user_index.get(discord_id, ())),
+        'overall_rank': overall_rank,
+        'season_rank': season_rank,
+        'awarded_role_ids': sheet_cache.awarded_role_ids,
+    }
+
+
+@tasks.loop(minutes=SHEET_REFRESH_MINUTES)
+async def refresh_sheet_loop():
+    try:
+        await refresh_sheet_cache()
     except Exception as e:
-        print(f'Error sending log: {e}')
+        log.error("Error refreshing sheet cache: %s", e)
+
+
+# Started right after the warm-up's full download, so the first refresh waits a whole interval like the rest
+@refresh_sheet_loop.before_loop
+async def wait_before_first_refresh():
+    await asyncio.sleep(SHEET_REFRESH_MINUTES * 60)
+
+
+http_session = None
+
+
+# Shared aiohttp session, created lazily because it must be bound to the running event loop
+def get_http_session():
+    global http_session
+    if http_session is None or http_session.closed:
+        connector = aiohttp.TCPConnector(limit=THUMBNAIL_MAX_CONNECTIONS,
+                                         limit_per_host=THUMBNAIL_CONNECTIONS_PER_HOST,
+                                         ttl_dns_cache=300)
+        http_session = aiohttp.ClientSession(connector=connector,
+                                             timeout=aiohttp.ClientTimeout(total=THUMBNAIL_TIMEOUT))
+    return http_session
+
+
+class ThumbnailCache:
+    """Bounded LRU cache of scraped thumbnail URLs, persisted to disk between restarts.
+
+    A stored value of None is a negative entry: the page had no image or could not be fetched.
+    """
+
+    def __init__(self, path, max_entries, ttl, negative_ttl):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.entries = OrderedDict()  # key -> (thumbnail url or None, expires at)
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+
+    def get(self, key):
+        """Return (True, url) on a hit and (False, None) on a miss."""
+        entry = self.entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self.entries[key]
+                self.dirty = True
+            self.misses += 1
+            return False, None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[0]
+
+    def put(self, key, url, ttl=None):
+        if ttl is None:
+            ttl = self.ttl if url else self.negative_ttl
+        self.entries[key] = (url, time.time() + ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.dirty = True
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'negative': sum(1 for url, _ in self.entries.values() if not url),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as cache_file:
+                data = json.load(cache_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            log.warning("Could not load thumbnail cache from %s: %s", self.path, e)
+            return
+
+        now = time.time()
+        for key, url, expires_at in data.get('entries', []):
+            if expires_at > now:
+                self.entries[key] = (url, expires_at)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def save(self):
+        if not self.dirty:
+            return
+        # Write to a temporary file first so a crash never leaves a half-written cache behind
+        entries = [[key, url, expires_at] for key, (url, expires_at) in self.entries.items()]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as cache_file:
+            json.dump({'entries': entries}, cache_file)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
 
+thumbnail_cache = ThumbnailCache(THUMBNAIL_CACHE_FILE, THUMBNAIL_CACHE_MAX_ENTRIES,
+                                 THUMBNAIL_CACHE_TTL, THUMBNAIL_CACHE_NEGATIVE_TTL)
+thumbnail_cache.load()
+
+# Query parameters that only track where a link was shared from
+TRACKING_PARAMS = {'si', 'ref', 'fbclid', 'gclid', 'feature'}
+
+
+# Normalise a link so the same track shared in different ways maps to one cache entry
+def normalise_link(link):
+    parsed = urlparse(link.strip())
+    netloc = parsed.netloc.lower()
+    if netloc.startswith('www.') or netloc.startswith('m.'):
+        netloc = netloc.split('.', 1)[1]
+    query = sorted((k, v) for k, v in parse_qsl(parsed.query)
+                   if k not in TRACKING_PARAMS and not k.startswith('utm_'))
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse((parsed.scheme.lower() or 'https', netloc, path, '', urlencode(query), ''))
+
+
+@tasks.loop(minutes=10)
+async def save_thumbnail_cache():
+    try:
+        thumbnail_cache.save()
+    except Exception as e:
+        log.error("Error saving thumbnail cache: %s", e)
 
 
 # Function For Thumbnail Fetching
-def fetch_thumbnail(link):
+async def fetch_thumbnail(link):
     try:
         # Handle YouTube links separately
         if 'youtube.com' in link or 'youtu.be' in link:
@@ -122,39 +1311,96 @@ def fetch_thumbnail(link):
                 return thumbnail_url
             else:
                 return None
-        # Handle SoundCloud links
-        if 'soundcloud.com' in link:
-            response = requests.get(link)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-            meta_tag = soup.find('meta', property='twitter:image')
-            if meta_tag:
-                return meta_tag.get('content')
-            else:
-                return None
-        else:
-            # For other links
-            response = requests.get(link)
-            response.raise_for_status()
-
-            # Try finding og:image
-            soup = BeautifulSoup(response.text, 'html.parser')
-            og_image = soup.find('meta', property='og:image')
-            if og_image and og_image['content']:
-                return og_image['content']
-
-            # Fallback to regex search if no og:image tag found
-            match = re.search(r'og:image" content="(.*?)"', response.text)
-            if match:
-                return match.group(1)
-            else:
-                return None
+
+        if not link:
+            return None
+
+        key = normalise_link(link)
+        hit, cached_url = thumbnail_cache.get(key)
+        if hit:
+            return cached_url
+
+        ttl = None
+        try:
+            thumbnail_url = await fetch_flights.do(('thumbnail', key), scrape_thumbnail, link, THUMBNAIL_TIMEOUT)
+        except aiohttp.ClientResponseError as e:
+            # A page that is gone stays gone; any other error status may clear up
+            thumbnail_url = None
+            ttl = None if e.status in (404, 410) else THUMBNAIL_CACHE_FAILURE_TTL
+        except Exception:
+            # Timeouts and connection failures are only remembered briefly, so one slow response
+            # doesn't hide the image for hours
+            thumbnail_url = None
+            ttl = THUMBNAIL_CACHE_FAILURE_TTL
+        thumbnail_cache.put(key, thumbnail_url, ttl)
+        return thumbnail_url
 
     except Exception as e:
         return None
 
 
+class HeadMetaParser(HTMLParser):
+    """Incremental parser that collects preview image <meta> tags until the end of <head>."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.images = {}
+        self.head_done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'meta':
+            attrs = dict(attrs)
+            key = attrs.get('property') or attrs.get('name')
+            content = attrs.get('content')
+            if key in ('og:image', 'twitter:image') and content and key not in self.images:
+                self.images[key] = content
+        elif tag == 'body':
+            self.head_done = True
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.head_done = True
+
+
+# Stream a page and pull its preview image out of the <head> meta tags
+async def scrape_thumbnail(link, timeout):
+    # SoundCloud only exposes its artwork through twitter:image
+    wanted = 'twitter:image' if 'soundcloud.com' in link else 'og:image'
+    parser = HeadMetaParser()
+    head_text = []
+    bytes_read = 0
+
+    session = get_http_session()
+    async with session.get(link, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+        response.raise_for_status()
+        try:
+            decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        async for chunk in response.content.iter_chunked(THUMBNAIL_CHUNK_SIZE):
+            bytes_read += len(chunk)
+            text = decoder.decode(chunk)
+            head_text.append(text)
+            parser.feed(text)
+            if wanted in parser.images or parser.head_done or bytes_read >= THUMBNAIL_MAX_HEAD_BYTES:
+                # Drop the connection rather than downloading the rest of the body
+                response.close()
+                break
+
+    if wanted in parser.images:
+        return parser.images[wanted]
+    if wanted == 'twitter:image':
+        return None
+
+    # Fallback to regex search if the og:image tag could not be parsed
+    match = re.search(r'og:image" content="(.*?)"', ''.join(head_text))
+    if match:
+        return match.group(1)
+    else:
+        return None
+
+
 def get_previous_friday():
     today = datetime.today().date()  # Get today's date
     if today.weekday() == 4:
@@ -196,50 +1442,35 @@ def parse_date(date_str):
         return None  # Return None if the format is invalid
 
 
-
-# Function for sending embed messages (tree commands)
-async def send_embed(interaction, rows, date):
-    # Fetch the color from the first row's 'Colour' field
-    color_value = rows[0].get('Colour', None)
-
-    # Set the default color to blue if no valid color is found
+# Function to build the embed for a week's rows; shared by the slash and prefix week commands
+async def build_week_embed(rows):
+    # Use the first row's 'Colour' (validated at ingest), defaulting to blue
     color = discord.Color.blue()
-    if color_value:
-        try:
-            # Convert the color value (e.g., "#3618f6") into a valid Discord Color
-            color = discord.Color(int(color_value.strip('#'), 16))
-        except ValueError:
-            print(f"Invalid color value: {color_value}. Defaulting to blue.")
+    if rows[0].colour is not None:
+        color = discord.Color(rows[0].colour)
 
     embed = discord.Embed(
-        title=f"New Music {rows[0]['Date']}",
+        title=f"New Music {rows[0].date_label}",
         color=color,
     )
 
     entry_lines = ""
     # Fetch the Thumbnail Image link from the first row (if available)
-    thumbnail_image_url = rows[0].get('Thumbnail Image', None)
+    thumbnail_image_url = rows[0].thumbnail_image
 
     for index, row in enumerate(rows):
-        # Get the Discord ID and format it as a mention
-        discord_id = row.get('Discord')
-        user_mention = f"<@{discord_id}>"
-        
-        # Get the Song Name
-        song_name = row.get('Song Name', 'Unknown Track')
-        
-        # Get the Listen Link
-        listen_link = row.get('Listen Link', '')
-        
+        # Format the Discord ID as a mention
+        user_mention = f"<@{row.discord}>"
+
         # Format the song name as a hyperlink with the listen link
+        listen_link = row.listen_link
         if listen_link:
-            song_formatted = f"[{song_name}]({listen_link})"
+            song_formatted = f"[{row.song_name}]({listen_link})"
         else:
-            song_formatted = song_name
+            song_formatted = row.song_name
 
         # Get the Buy / Hypeddit link if available
-        buy_link = row.get('Buy / Hypeddit', '')
-        buy_formatted = f"[Buy]({buy_link})" if buy_link and buy_link.strip() != "" else ""
+        buy_formatted = f"[Buy]({row.buy_link})" if row.buy_link else ""
 
         # Build the entry line: user - Song Name - Buy (omit Buy if not present)
         if buy_formatted:
@@ -253,93 +1484,245 @@ async def send_embed(interaction, rows, date):
             if thumbnail_image_url:
                 embed.set_image(url=thumbnail_image_url)
             else:
-                fetched_thumbnail_url = fetch_thumbnail(listen_link)
+                fetched_thumbnail_url = await fetch_thumbnail(listen_link)
                 embed.set_image(url=fetched_thumbnail_url)
 
     # Add a single embed field containing all the entries
     embed.add_field(name="Submissions", value=entry_lines, inline=False)
 
     # Use week image as thumbnail if available (overrides the default thumbnail set above)
-    week_image_url = rows[0].get('Week Image', None)
+    week_image_url = rows[0].week_image
     if week_image_url:
         embed.set_thumbnail(url=week_image_url)
 
-    embed.set_footer(text=f"{rows[0]['Comment']}")
-
-    await interaction.followup.send(embed=embed)
-
+    embed.set_footer(text=rows[0].comment)
+    return embed
 
-# Function for sending embed messages (ctx commands)
-async def ctx_send_embed(ctx, rows, date):
-    # Fetch the color from the first row's 'Colour' field
-    color_value = rows[0].get('Colour', None)
 
-    # Set the default color to blue if no valid color is found
-    color = discord.Color.blue()
-    if color_value:
-        try:
-            # Convert the color value (e.g., "#3618f6") into a valid Discord Color
-            color = discord.Color(int(color_value.strip('#'), 16))
-        except ValueError:
-            print(f"Invalid color value: {color_value}. Defaulting to blue.")
+# Send a week's embed, rendered once per change to that week; `week_key` is the key the rows were looked up by
+async def send_week_embed(send, week_key, rows):
+    cache_key = (week_key, sheet_cache.week_versions.get(week_key))
+    embed = week_embed_cache.get(cache_key)
+    if embed is None:
+        embed = await build_week_embed(rows)
+        # An image that could not be scraped this time is worth trying again next time
+        if embed.image.url or not rows[0].listen_link:
+            week_embed_cache.put(cache_key, embed)
+    await send(content=stale_notice(), embed=embed)
+
+
+def leaderboard_page_count(leaderboard):
+    return max(1, -(-len(leaderboard.entries) // LEADERBOARD_USERS_PER_PAGE))
+
+
+# Function to build one leaderboard page (0-based) from a precomputed season leaderboard
+def render_leaderboard_page(leaderboard, page):
+    users_per_page = LEADERBOARD_USERS_PER_PAGE
+    total_entries = len(leaderboard.entries)
+    i = page * users_per_page
+    page_data = leaderboard.entries[i:i + users_per_page]
+    leaderboard_lines = []
+    for index, (user_id, mention_count) in enumerate(page_data, start=i + 1):
+        if user_id.isdigit():
+            mention = f"<@{user_id}>"
+        else:
+            mention = leaderboard.user_names.get(user_id, "Unknown User")
+
+        leaderboard_lines.append(f"**{index}.** {mention} — **{mention_count} mentions**")
+    embed_description = (
+        f"👥 Drum&BassHeadsUK\n"
+        f"👑Leaderboard👑\n"
+        f"👉 Season: {leaderboard.season}\n"
+        f"👫 Entries: {total_entries}\n\n"
+        f"" + "\n".join(leaderboard_lines)
+    )
 
     embed = discord.Embed(
-        title=f"New Music {rows[0]['Date']}",
-        color=color,
+        description=embed_description,
+        color=discord.Color.from_str(leaderboard.colour),
     )
+    embed.set_footer(text=f"Page {page + 1}")
+    embed.set_thumbnail(url=leaderboard.top_right_image)
+    embed.set_image(url=leaderboard.thumbnail)
+    return embed
 
-    entry_lines = ""
-    # Fetch the Thumbnail Image link from the first row (if available)
-    thumbnail_image_url = rows[0].get('Thumbnail Image', None)
 
-    for index, row in enumerate(rows):
-        # Get the Discord ID and format it as a mention
-        discord_id = row.get('Discord')
-        user_mention = f"<@{discord_id}>"
-        
-        # Get the Song Name
-        song_name = row.get('Song Name', 'Unknown Track')
-        
-        # Get the Listen Link
-        listen_link = row.get('Listen Link', '')
-        
-        # Format the song name as a hyperlink with the listen link
-        if listen_link:
-            song_formatted = f"[{song_name}]({listen_link})"
+class ProfilePages:
+    """A user's profile, paged over their submissions (newest first); pages are rendered one at a time."""
+
+    def __init__(self, user, profile_data):
+        self.user = user
+        self.submissions = profile_data['submissions']
+        self.overall_rank = profile_data['overall_rank']
+        self.season_rank = profile_data['season_rank']
+        matched = {role.id for role in user.roles}.intersection(profile_data['awarded_role_ids'])
+        self.awarded = [f"<@&{rid}>" for rid in matched]
+
+    def page_count(self):
+        return max(1, -(-len(self.submissions) // PROFILE_ENTRIES_PER_PAGE))
+
+    def render(self, page):
+        start = page * PROFILE_ENTRIES_PER_PAGE
+        entries = [f"{row.week_label} - [{row.song_name}]({row.listen_link})"
+                   for row in self.submissions[start:start + PROFILE_ENTRIES_PER_PAGE]]
+        emb = discord.Embed(
+            title=f"{self.user.display_name}'s NMF Profile",
+            color=discord.Color.from_str("#3618f6"),
+            timestamp=datetime.now(dt.timezone.utc)
+        )
+        emb.set_thumbnail(url=self.user.avatar.url)
+        emb.add_field(name="Selection(s)", value="\n".join(entries), inline=False)
+        if self.awarded:
+            emb.add_field(name="Awarded", value=" ".join(self.awarded), inline=False)
+        emb.add_field(name="Total Mentions", value=f"**{len(self.submissions)}**", inline=True)
+        if self.overall_rank is not None:
+            emb.add_field(name="Overall Rank", value=f"**{self.overall_rank}**", inline=True)
+        if self.season_rank is not None:
+            emb.add_field(name="Season Rank", value=f"**{self.season_rank}**", inline=True)
+        return emb
+
+
+class EmbedCache:
+    """Bounded LRU of rendered embeds."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        embed = self.entries.get(key)
+        if embed is None:
+            self.misses += 1
         else:
-            song_formatted = song_name
-
-        # Get the Buy / Hypeddit link if available
-        buy_link = row.get('Buy / Hypeddit', '')
-        buy_formatted = f"[Buy]({buy_link})" if buy_link and buy_link.strip() != "" else ""
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return embed
+
+    def put(self, key, embed):
+        self.entries[key] = embed
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get_or_render(self, key, render):
+        embed = self.get(key)
+        if embed is None:
+            embed = render()
+            self.put(key, embed)
+        return embed
+
+
+page_cache = EmbedCache(PAGE_CACHE_SIZE)  # (season, page, snapshot version) -> leaderboard embed
+week_embed_cache = EmbedCache(WEEK_EMBED_CACHE_SIZE)  # (week key, version it last changed) -> embed
+
+
+# Leaderboard pages look the same to everyone and are shared. Profile pages show the member's name, avatar and roles
+# in the server they were asked from, so they are rendered fresh every time
+def render_cached_page(kind, key, page, version, render_page):
+    if kind != 'lb':
+        return render_page(page)
+    return page_cache.get_or_render((key, page, version), functools.partial(render_page, page))
+
+
+# Renderer and page count for a paginated message: a season leaderboard ('lb') or a user's profile ('pf')
+async def page_source(kind, key, guild):
+    if kind == 'lb':
+        leaderboard = await get_season_leaderboard(key)
+        return functools.partial(render_leaderboard_page, leaderboard), leaderboard_page_count(leaderboard)
+    member = guild.get_member(key) or await guild.fetch_member(key)
+    profile_pages = ProfilePages(member, await get_profile_data(str(key)))
+    return profile_pages.render, profile_pages.page_count()
+
+
+PAGE_BUTTON_TEMPLATE = r'page:(?P<kind>lb|pf):(?P<key>\d+):(?P<owner>\d+):(?P<version>\d+):(?P<page>\d+):(?P<step>[pn])'
+
+
+class PageButton(discord.ui.DynamicItem[Button], template=PAGE_BUTTON_TEMPLATE):
+    """Previous / Next button whose custom_id holds everything needed to render the page it leads to.
+
+    The custom_id is (kind, season or user ID, owner, snapshot version, target page, step). It is registered
+    once in setup_hook, so nothing is kept in memory per message and the buttons keep working after a restart.
+    """
+
+    def __init__(self, kind, key, owner_id, version, page, step, disabled=False):
+        super().__init__(Button(label="Previous" if step == 'p' else "Next", style=discord.ButtonStyle.secondary,
+                                disabled=disabled, custom_id=f"page:{kind}:{key}:{owner_id}:{version}:{page}:{step}"))
+        self.kind = kind
+        self.key = key
+        self.owner_id = owner_id
+        self.version = version
+        self.page = page
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(match['kind'], int(match['key']), int(match['owner']), int(match['version']),
+                   int(match['page']), match['step'])
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message(f"This was opened by <@{self.owner_id}>, you can't do that!",
+                                                    ephemeral=True)
+            return False
+        retry_after = rate_limit('page', interaction.user, interaction.guild)
+        if retry_after:
+            await send_rate_limited(interaction, retry_after)
+            return False
+        return True
+
+    async def callback(self, interaction: discord.Interaction):
+        # Before the startup warm-up has loaded the snapshot, waiting for it can outlast the 3 second reply window
+        if sheet_cache.rows is None:
+            await interaction.response.defer()
+        try:
+            render_page, page_count = await page_source(self.kind, self.key, interaction.guild)
+        except discord.NotFound:
+            await self.send_error(interaction, "That user is no longer in this server.")
+            return
+        except Exception as e:
+            await self.send_error(interaction, f"An error occurred: {e}")
+            log.exception("Page button failed", extra=command_fields(interaction))
+            return
 
-        # Build the entry line: user - Song Name - Buy (omit Buy if not present)
-        if buy_formatted:
-            line = f"{song_formatted} - {user_mention} - {buy_formatted}"
+        # A refresh since this message was posted may have changed the page count
+        version = sheet_cache.version
+        page = min(self.page, page_count - 1)
+        if version != self.version:
+            log.debug("Paging %s:%s from snapshot %d on snapshot %d", self.kind, self.key, self.version, version)
+        embed = render_cached_page(self.kind, self.key, page, version, render_page)
+        view = page_buttons(self.kind, self.key, self.owner_id, version, page, page_count)
+        if interaction.response.is_done():
+            await interaction.edit_original_response(content=stale_notice(), embed=embed, view=view)
         else:
-            line = f"{song_formatted} - {user_mention}"
-        entry_lines += f"{index + 1}. {line}\n"
+            await interaction.response.edit_message(content=stale_notice(), embed=embed, view=view)
 
-        # Thumbnail: for the first row, set an image from the Thumbnail Image field
-        if index == 0:
-            if thumbnail_image_url:
-                embed.set_image(url=thumbnail_image_url)
-            else:
-                fetched_thumbnail_url = fetch_thumbnail(listen_link)
-                embed.set_image(url=fetched_thumbnail_url)
+    # Nothing has answered the interaction yet unless the callback deferred while the snapshot was loading
+    @staticmethod
+    async def send_error(interaction, message):
+        if interaction.response.is_done():
+            await interaction.followup.send(message, ephemeral=True)
+        else:
+            await interaction.response.send_message(message, ephemeral=True)
 
-    # Add a single embed field containing all the entries
-    embed.add_field(name="Submissions", value=entry_lines, inline=False)
 
-    # Use week image as thumbnail if available (overrides the default thumbnail set above)
-    week_image_url = rows[0].get('Week Image', None)
-    if week_image_url:
-        embed.set_thumbnail(url=week_image_url)
+def page_buttons(kind, key, owner_id, version, page, page_count):
+    view = View(timeout=None)
+    view.add_item(PageButton(kind, key, owner_id, version, max(page - 1, 0), 'p', disabled=page <= 0))
+    view.add_item(PageButton(kind, key, owner_id, version, min(page + 1, page_count - 1), 'n',
+                             disabled=page >= page_count - 1))
+    return view
 
-    embed.set_footer(text=f"{rows[0]['Comment']}")
 
-    # Changed from interaction.followup.send to ctx.send
-    await ctx.send(embed=embed)
+# Send page one, with paging buttons when there is more than one page; `send` is ctx.send or followup.send
+async def send_pages(send, kind, key, render_page, page_count, owner_id):
+    version = sheet_cache.version
+    embed = render_cached_page(kind, key, 0, version, render_page)
+    if page_count > 1:
+        await send(content=stale_notice(), embed=embed,
+                   view=page_buttons(kind, key, owner_id, version, 0, page_count))
+    else:
+        await send(content=stale_notice(), embed=embed)
 
 
 # FUnction to create commands embed (help command wala)
@@ -359,7 +1742,11 @@ def create_commands_embed(author):
                     value="Check your own stats or mention another user to see their stats. If no user is mentioned, "
                           "it will show your own stats.",
                     inline=False)
-    embed.add_field(name="**__New Music Friday Seasons__**\n!season !lastseason !season1 !leaderboard1 or /season1",
+    embed.add_field(name="**__New Music Friday Seasons__**\n!season `<season_number>` or /season `<season_number>`",
+                    value="Check to see whose tracks got mentioned most in any NMF season. Leave out the number "
+                          "for the current season.",
+                    inline=False)
+    embed.add_field(name="!lastseason !season1 !leaderboard1 or /season1",
                     value="Check to see whose tracks got mentioned most in NMF Season 1.",
                     inline=False)
 
@@ -374,33 +1761,63 @@ def create_commands_embed(author):
             value="Override manually & generates mentions role.",
             inline=False
         )
+        embed.add_field(
+            name="!cachestats",
+            value="Shows sheet snapshot and thumbnail cache statistics.",
+            inline=False
+        )
 
     return embed
 
 
-# Function to check if the user is on cooldown for the commands embed
-def is_user_on_cooldown(user_id):
-    if user_id not in user_cooldowns:
-        return False
-    return time.time() - user_cooldowns[user_id] < COOLDOWN_DURATION
+class TriggerMatcher:
+    """Message triggers compiled into a single alternation of named groups, with a hit counter per trigger."""
 
+    def __init__(self, triggers):
+        alternatives = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in triggers.items())
+        self.pattern = re.compile(alternatives) if triggers else None
+        self.handlers = {}
+        self.hits = Counter(dict.fromkeys(triggers, 0))
 
-# Function to set the user cooldown
-def set_user_cooldown(user_id):
-    user_cooldowns[user_id] = time.time()
+    def handler(self, name):
+        """Decorator registering the coroutine run with the message when trigger `name` matches."""
+        if name not in self.hits:
+            raise ValueError(f"No message trigger named {name!r} in MESSAGE_TRIGGERS")
 
+        def register(func):
+            self.handlers[name] = func
+            return func
+        return register
 
-async def handle_command_help(message):
-    author_id = message.author.id
+    # The first trigger found in the message wins; the outermost named group is always the last one closed.
+    # Lowercasing once and matching case-sensitively is faster than an IGNORECASE search
+    def match(self, content):
+        if self.pattern is None or not content:
+            return None
+        match = self.pattern.search(content.lower())
+        if match is None:
+            return None
+        self.hits[match.lastgroup] += 1
+        return match.lastgroup
+
+    async def dispatch(self, message):
+        name = self.match(message.content)
+        handler = self.handlers.get(name)
+        if handler is not None:
+            await handler(message)
+
+
+message_triggers = TriggerMatcher(MESSAGE_TRIGGERS)
 
-    # Check if the user is on cooldown and if so, do nothing (no message)
-    if is_user_on_cooldown(author_id):
+
+@message_triggers.handler('command_help')
+async def handle_command_help(message):
+    # Over the limit, do nothing (no message)
+    if rate_limit('command_help', message.author, message.guild):
         return
 
-    # Send embed and set cooldown
     embed = create_commands_embed(message.author)
     await message.channel.send(embed=embed)
-    set_user_cooldown(author_id)
 
 
 """ Tree Commands """
@@ -415,28 +1832,17 @@ async def send_weekly_winner_embed(interaction: discord.Interaction, week_number
     await interaction.response.defer()
 
     try:
-        # Expected headers
-        expected_headers = ['Week', 'Date', 'Name', 'Discord', 'Song Name', 'Listen Link', 'Comment', 'Buy / Hypeddit',
-                            'Week Image', 'Colour', 'Thumbnail Image']
-        data = sheet.get_all_records(expected_headers=expected_headers)
-
-        # print(f"All Data: {data}")
-
-        rows = [row for row in data if int(row['Week'].replace('Week ', '').strip()) == week_number]
-
-        # print(f"Filtered Rows for Week {week_number}: {rows}")
+        rows = await get_week_rows(week_number)
 
         if not rows:
             await interaction.followup.send(f"Week {week_number} not found in the spreadsheet.")
             return
 
-        #  date from the first row
-        week_date = rows[0]['Date']
-        await send_embed(interaction, rows, week_date)
+        await send_week_embed(interaction.followup.send, ('week', week_number), rows)
 
     except Exception as e:
         await interaction.followup.send(f"An error occurred: {e}")
-        print(f"Error: {e}")
+        log.exception("Command failed", extra=command_fields(interaction))
 
 
 # Previous week command
@@ -446,26 +1852,21 @@ async def send_last_week_embed(interaction: discord.Interaction):
 
     try:
         # Get the previous Friday's date
-        previous_friday = get_previous_friday().strftime('%A %d/%m/%y')
-
-        # Expected headers in the Google Sheet
-        expected_headers = ['Week', 'Date', 'Name', 'Discord', 'Song Name', 'Listen Link', 'Comment', 'Buy / Hypeddit',
-                            'Week Image', 'Colour', 'Thumbnail Image']
-        data = sheet.get_all_records(expected_headers=expected_headers)
+        friday = get_previous_friday()
+        previous_friday = friday.strftime('%A %d/%m/%y')
 
-        # Fetch rows for the previous Friday
-        rows = [row for row in data if row['Date'] == previous_friday]
+        rows = await get_date_rows(friday)
 
         if not rows:
             await interaction.followup.send(f"No data found for {previous_friday}.")
             return
 
         # Same logic as the week command for generating the embed
-        await send_embed(interaction, rows, previous_friday)
+        await send_week_embed(interaction.followup.send, ('date', friday.toordinal()), rows)
 
     except Exception as e:
         await interaction.followup.send(f"An error occurred: {e}")
-        print(f"Error: {e}")
+        log.exception("Command failed", extra=command_fields(interaction))
 
 
 # This week command
@@ -475,26 +1876,19 @@ async def send_this_week_embed(interaction: discord.Interaction):
 
     try:
         # this week's Friday's date
-        this_friday = get_this_friday().strftime('%A %d/%m/%y')
+        friday = get_this_friday()
 
-        # Expected headers
-        expected_headers = ['Week', 'Date', 'Name', 'Discord', 'Song Name', 'Listen Link', 'Comment', 'Buy / Hypeddit',
-                            'Week Image', 'Colour', 'Thumbnail Image']
-        data = sheet.get_all_records(expected_headers=expected_headers)
-
-        rows = [row for row in data if row['Date'] == this_friday]
+        rows = await get_date_rows(friday)
 
         if not rows:
             await interaction.followup.send("Coming soon, please wait. Data for this Friday is not yet uploaded.")
             return
 
-        await send_embed(interaction, rows, this_friday)
+        await send_week_embed(interaction.followup.send, ('date', friday.toordinal()), rows)
 
     except Exception as e:
         await interaction.followup.send(f"An error occurred: {e}")
-        print(f"Error: {e}")
-
-
+        log.exception("Command failed", extra=command_fields(interaction))
 
 
 @bot.tree.command(name="profile", description="Fetch your stats or another users.")
@@ -508,501 +1902,149 @@ async def profile(interaction: discord.Interaction, user: discord.Member = None)
         user = interaction.user
 
     discord_id = str(user.id)
-    excluded_user_id = '762317361822564412'
 
     try:
-        expected_headers = ['Week', 'Date', 'Name', 'Discord', 'Song Name', 'Listen Link', 'Roles for Profile']
-        data = sheet.get_all_records(expected_headers=expected_headers)
-
-        # -------------------------------
-        # Calculate Overall Rank (All-time mentions)
-        # -------------------------------
-        overall_mention_counts = {}
-        for row in data:
-            uid = str(row.get('Discord'))
-            if uid and uid != excluded_user_id:
-                overall_mention_counts[uid] = overall_mention_counts.get(uid, 0) + 1
+        profile_data = await get_profile_data(discord_id)
 
-        overall_rank_field = None
-        if discord_id in overall_mention_counts:
-            sorted_overall = sorted(overall_mention_counts.items(), key=lambda x: x[1], reverse=True)
-            for idx, (uid, _) in enumerate(sorted_overall):
-                if uid == discord_id:
-                    overall_rank_field = idx + 1
-                    break
-        elif discord_id != excluded_user_id:
-            overall_rank_field = len(overall_mention_counts) + 1
-
-        # -------------------------------
-        # Calculate Leaderboard Rank (Season period)
-        # -------------------------------
-        period_start = datetime(2024, 12, 3)
-        period_end = datetime(2025, 12, 2)
-
-        ranking_counts = {}
-        for row in data:
-            date_val = parse_date(row['Date'])
-            if date_val and period_start <= date_val <= period_end:
-                uid = str(row.get('Discord'))
-                if uid and uid != excluded_user_id:
-                    ranking_counts[uid] = ranking_counts.get(uid, 0) + 1
-
-        leaderboard_rank_field = None
-        if discord_id in ranking_counts:
-            sorted_season = sorted(
-                {k: v for k, v in ranking_counts.items() if k != excluded_user_id}.items(),
-                key=lambda x: x[1], reverse=True
-            )
-            for idx, (uid, _) in enumerate(sorted_season):
-                if uid == discord_id:
-                    leaderboard_rank_field = idx + 1
-                    break
-        elif discord_id != excluded_user_id:
-            leaderboard_rank_field = len(ranking_counts) + 1
-        if discord_id == excluded_user_id:
-            overall_rank_field = '-'
-            leaderboard_rank_field = '-'
-
-        # -------------------------------
-        # Filter user data
-        # -------------------------------
-        user_data = [r for r in data if str(r.get('Discord')) == discord_id]
-        if not user_data:
+        # Submissions for this user, newest first
+        if not profile_data['submissions']:
             await interaction.followup.send(f"No data found for {user.mention}.")
             return
 
-        user_data.sort(key=lambda r: parse_date(r['Date']) or datetime.min, reverse=True)
-
-        # Extract roles
-        role_ids_from_sheet = set()
-        for row in data:
-            roles = row.get('Roles for Profile', "")
-            if roles:
-                try:
-                    if isinstance(roles, int):
-                        role_ids_from_sheet.add(roles)
-                    elif isinstance(roles, str):
-                        valid = [int(x.strip()) for x in roles.split(',') if x.strip().isdigit()]
-                        role_ids_from_sheet.update(valid)
-                except ValueError:
-                    print(f"Warning: Could not parse role ID from '{roles}' in sheet.")
-
-        user_role_ids = {role.id for role in user.roles}
-        matched = user_role_ids.intersection(role_ids_from_sheet)
-        matched_mentions = [f"<@&{rid}>" for rid in matched]
-
-        # Build pages
-        pages = []
-        per_page = 5
-        batch = []
-
-        def make_embed(entries):
-            emb = discord.Embed(
-                title=f"{user.display_name}'s NMF Profile",
-                color=discord.Color.from_str("#3618f6"),
-                timestamp=datetime.now(dt.timezone.utc)
-            )
-            emb.set_thumbnail(url=user.avatar.url)
-            emb.add_field(name="Selection(s)", value="\n".join(entries), inline=False)
-            if matched_mentions:
-                emb.add_field(name="Awarded", value=" ".join(matched_mentions), inline=False)
-            emb.add_field(name="Total Mentions", value=f"**{len(user_data)}**", inline=True)
-            if overall_rank_field is not None:
-                emb.add_field(name="Overall Rank", value=f"**{overall_rank_field}**", inline=True)
-            if leaderboard_rank_field is not None:
-                emb.add_field(name="Season Rank", value=f"**{leaderboard_rank_field}**", inline=True)
-            return emb
-
-        for row in user_data:
-            week = row.get('Week', 'Unknown Week')
-            song = row.get('Song Name', 'Unknown Song')
-            link = row.get('Listen Link', '')
-            batch.append(f"{week} - [{song}]({link})")
-            if len(batch) >= per_page:
-                pages.append(make_embed(batch))
-                batch = []
-        if batch:
-            pages.append(make_embed(batch))
-
-        # Pagination
-        class PaginationView(View):
-            def __init__(self, pages, user):
-                super().__init__(timeout=None)
-                self.pages = pages
-                self.current = 0
-                self.user = user
-                if len(pages) <= 1:
-                    self.children[1].disabled = True
-
-            async def interaction_check(self, interaction):
-                return interaction.user == self.user
-
-            @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary, disabled=True)
-            async def prev(self, interaction, button: Button):
-                self.current = max(self.current - 1, 0)
-                button.disabled = self.current == 0
-                self.children[1].disabled = False
-                await interaction.response.edit_message(embed=self.pages[self.current], view=self)
-
-            @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
-            async def nxt(self, interaction, button: Button):
-                self.current = min(self.current + 1, len(self.pages) - 1)
-                button.disabled = self.current == len(self.pages) - 1
-                self.children[0].disabled = False
-                await interaction.response.edit_message(embed=self.pages[self.current], view=self)
-
-        if len(pages) > 1:
-            view = PaginationView(pages, interaction.user)
-            await interaction.followup.send(embed=pages[0], view=view)
-        else:
-            await interaction.followup.send(embed=pages[0])
+        profile_pages = ProfilePages(user, profile_data)
+        await send_pages(interaction.followup.send, 'pf', user.id, profile_pages.render, profile_pages.page_count(),
+                         interaction.user.id)
 
     except gspread.exceptions.APIError as e:
         await interaction.followup.send(f"Error accessing Google Sheet. Please check credentials and sheet permissions. Details: {e}")
-        print(f"GSpread API Error: {e}")
+        log.error("GSpread API Error: %s", e, extra=command_fields(interaction))
     except Exception as e:
         await interaction.followup.send(f"An unexpected error occurred: {e}")
-        traceback.print_exc()
-# Season1 Leaderboard Command
-@bot.tree.command(name="season1", description="Display the Season 1 leaderboard.")
-async def season1(interaction: discord.Interaction):
-    await interaction.response.defer()
-    excluded_user_id = '762317361822564412'
+        log.exception("Command failed", extra=command_fields(interaction))
 
-    try:
-        expected_headers = ['Week', 'Date', 'Name', 'Discord', 'Song Name', 'Listen Link',
-                            'Season starts 4th December', 'NMF Leaderboard Thumbnail', 'Top right image',
-                            'Leaderboard Colour']
-        data = sheet.get_all_records(expected_headers=expected_headers)
-
-        season_metadata_row = next((row for row in data if row.get('Season starts 4th December') == 'Season1'), None)
-        if not season_metadata_row:
-            await interaction.followup.send("Season 1 metadata not found in the spreadsheet.")
-            return
 
-        nmf_leaderboard_thumbnail = season_metadata_row.get('NMF Leaderboard Thumbnail', '')
-        top_right_image = season_metadata_row.get('Top right image', '')
-        thumbnail_colour = season_metadata_row.get('Leaderboard Colour', '#000000')
+# Shared by the season commands: the leaderboard to show, or the reason there isn't one
+async def find_season_leaderboard(number):
+    if number not in SEASONS:
+        return None, f"I can't find Season {number} data in the sheet, sorry."
+    leaderboard = await get_season_leaderboard(number)
+    if leaderboard.metadata is None:
+        return None, f"Season {number} metadata not found in the spreadsheet."
+    return leaderboard, None
 
-        # Fetch Season 1 leaderboard data (Weeks 1-49)
-        season1_data = [row for row in data if
-                        'Week' in row and row['Week'].startswith("Week") and int(row['Week'].split()[1]) <= 49]
 
-        # Count mentions for each Discord ID
-        mention_counts = {}
-        user_names = {}
-        for row in season1_data:
-            discord_id = str(row['Discord'])
-            name = row['Name']
-            mention_counts[discord_id] = mention_counts.get(discord_id, 0) + 1
-            user_names[discord_id] = name
+async def send_season_leaderboard(interaction, number):
+    await interaction.response.defer()
 
-            # Sort leaderboard by mentions
-        sorted_leaderboard = sorted(mention_counts.items(), key=lambda x: x[1], reverse=True)
-        # Remove excluded user from the leaderboard
-        filtered_leaderboard = [item for item in sorted_leaderboard if item[0] != excluded_user_id]
-        total_entries = len(filtered_leaderboard)
-
-        # Paginate leaderboard (5 users per page)
-        pages = []
-        users_per_page = 10
-        for i in range(0, len(filtered_leaderboard), users_per_page):
-            page_data = filtered_leaderboard[i:i + users_per_page]
-            leaderboard_lines = []
-            for index, (user_id, mention_count) in enumerate(page_data, start=i + 1):
-                # Convert user_id to string and check validity
-                user_id = str(user_id)
-                if user_id.isdigit():
-                    mention = f"<@{user_id}>"
-                else:
-                    mention = user_names.get(user_id, "Unknown User")
-
-                leaderboard_lines.append(f"**{index}.** {mention} — **{mention_count} mentions**")
-            embed_description = (
-                f"👥 Drum&BassHeadsUK\n"
-                f"👑Leaderboard👑\n"
-                f"👉 Season: 1\n"
-                f"👫 Entries: {total_entries}\n\n"
-                f"" + "\n".join(leaderboard_lines)
-            )
-
-            # Create embed
-            embed = discord.Embed(
-                description=embed_description,
-                color=discord.Color.from_str(thumbnail_colour),
-            )
-            current_page_num = i // users_per_page + 1
-            embed.set_footer(text=f"Page {current_page_num}")
-            embed.set_thumbnail(url=top_right_image)
-            embed.set_image(url=nmf_leaderboard_thumbnail)
-            pages.append(embed)
-
-        # Pagination logic
-        class PaginationView(View):
-            def __init__(self, pages, original_user):
-                super().__init__(timeout=None)
-                self.pages = pages
-                self.current_page = 0
-                self.original_user = original_user
-                self.user_warnings = set()
-
-            async def interaction_check(self, interaction: discord.Interaction) -> bool:
-                if interaction.user != self.original_user:
-                    if interaction.user.id not in self.user_warnings:
-                        await interaction.response.send_message(
-                            f"This was opened by {self.original_user.mention}, you can't do that!",
-                            ephemeral=True
-                        )
-                        self.user_warnings.add(interaction.user.id)
-                    return False
-                return True
-
-            @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary, disabled=True)
-            async def previous_button(self, interaction: discord.Interaction, button: Button):
-                self.current_page -= 1
-                if self.current_page <= 0:
-                    self.current_page = 0
-                    button.disabled = True
-                self.children[1].disabled = False
-                await interaction.response.edit_message(embed=self.pages[self.current_page], view=self)
-
-            @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
-            async def next_button(self, interaction: discord.Interaction, button: Button):
-                self.current_page += 1
-                if self.current_page >= len(self.pages) - 1:
-                    self.current_page = len(self.pages) - 1
-                    button.disabled = True
-                self.children[0].disabled = False
-                await interaction.response.edit_message(embed=self.pages[self.current_page], view=self)
+    try:
+        leaderboard, problem = await find_season_leaderboard(number)
+        if problem:
+            await interaction.followup.send(problem)
+            return
 
         # Send the leaderboard
-        if len(pages) > 1:
-            view = PaginationView(pages, interaction.user)
-            await interaction.followup.send(embed=pages[0], view=view)
-        else:
-            await interaction.followup.send(embed=pages[0])
+        await send_pages(interaction.followup.send, 'lb', number,
+                         functools.partial(render_leaderboard_page, leaderboard),
+                         leaderboard_page_count(leaderboard), interaction.user.id)
 
     except Exception as e:
         await interaction.followup.send(f"An error occurred: {e}")
-        print(f"Error: {e}")
-
+        log.exception("Command failed", extra=command_fields(interaction))
 
-# Season2 Leaderboard Command
-@bot.tree.command(name="season2", description="Display the Season 2 leaderboard.")
-async def season2(interaction: discord.Interaction):
-    await interaction.response.defer()
-    excluded_user_id = '762317361822564412'
 
-    try:
-        expected_headers = ['Week', 'Date', 'Name', 'Discord', 'Song Name', 'Listen Link',
-                            'Season starts 4th December', 'NMF Leaderboard Thumbnail', 'Top right image',
-                            'Leaderboard Colour']
-        data = sheet.get_all_records(expected_headers=expected_headers)
-
-        # Filter metadata for Season 2
-        season_metadata_row = next((row for row in data if row.get('Season starts 4th December') == 'Season2'), None)
-        if not season_metadata_row:
-            await interaction.followup.send("Season 2 metadata not found in the spreadsheet.")
-            return
+# Season Leaderboard Command
+@bot.tree.command(name="season", description="Display a season's leaderboard.")
+@app_commands.describe(
+    number="The season number; defaults to the current season.",
+)
+async def season(interaction: discord.Interaction, number: int = None):
+    await send_season_leaderboard(interaction, CURRENT_SEASON if number is None else number)
 
-        # Extract Season 2 metadata
-        nmf_leaderboard_thumbnail = season_metadata_row.get('NMF Leaderboard Thumbnail', '')
-        top_right_image = season_metadata_row.get('Top right image', '')
-        thumbnail_colour = season_metadata_row.get('Leaderboard Colour', '#000000')
-
-        # Season 2 date range
-        season2_start = datetime(2024, 12, 3)
-        season2_end = datetime(2025, 12, 2)
-
-        # Filter Season 2 data based on the date range
-        season2_data = [
-            row for row in data
-            if 'Date' in row and parse_date(row['Date']) and season2_start <= parse_date(row['Date']) <= season2_end
-        ]
-
-        mention_counts = {}
-        user_names = {}
-        for row in season2_data:
-            discord_id = str(row['Discord'])
-            name = row['Name']
-            mention_counts[discord_id] = mention_counts.get(discord_id, 0) + 1
-            user_names[discord_id] = name
 
-        sorted_leaderboard = sorted(mention_counts.items(), key=lambda x: x[1], reverse=True)
-        filtered_leaderboard = [item for item in sorted_leaderboard if item[0] != excluded_user_id]
-        total_entries = len(filtered_leaderboard)
-
-        # Paginate leaderboard (5 users per page)
-        pages = []
-        users_per_page = 10
-        for i in range(0, len(filtered_leaderboard), users_per_page):
-            page_data = filtered_leaderboard[i:i + users_per_page]
-            leaderboard_lines = []
-            for index, (user_id, mention_count) in enumerate(page_data, start=i + 1):
-                user_id = str(user_id)
-                if user_id.isdigit():
-                    mention = f"<@{user_id}>"
-                else:
-                    mention = user_names.get(user_id, "Unknown User")
-
-                leaderboard_lines.append(f"**{index}.** {mention} — **{mention_count} mentions**")
-            embed_description = (
-                f"👥 Drum&BassHeadsUK\n"
-                f"👑Leaderboard👑\n"
-                f"👉 Season: 2\n"
-                f"👫 Entries: {total_entries}\n\n"
-                f"" + "\n".join(leaderboard_lines)
-            )
-
-            # Create embed
-            embed = discord.Embed(
-                description=embed_description,
-                color=discord.Color.from_str(thumbnail_colour),
-            )
-            current_page_num = i // users_per_page + 1
-            embed.set_footer(text=f"Page {current_page_num}")
-            embed.set_thumbnail(url=top_right_image)
-            embed.set_image(url=nmf_leaderboard_thumbnail)
-            pages.append(embed)
-
-        # Pagination logic
-        class PaginationView(View):
-            def __init__(self, pages, original_user):
-                super().__init__(timeout=None)
-                self.pages = pages
-                self.current_page = 0
-                self.original_user = original_user
-                self.user_warnings = set()
-
-            async def interaction_check(self, interaction: discord.Interaction) -> bool:
-                if interaction.user != self.original_user:
-                    if interaction.user.id not in self.user_warnings:
-                        await interaction.response.send_message(
-                            f"This was opened by {self.original_user.mention}, you can't do that!",
-                            ephemeral=True
-                        )
-                        self.user_warnings.add(interaction.user.id)
-                    return False
-                return True
-
-            @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary, disabled=True)
-            async def previous_button(self, interaction: discord.Interaction, button: Button):
-                self.current_page -= 1
-                if self.current_page <= 0:
-                    self.current_page = 0
-                    button.disabled = True
-                self.children[1].disabled = False
-                await interaction.response.edit_message(embed=self.pages[self.current_page], view=self)
-
-            @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
-            async def next_button(self, interaction: discord.Interaction, button: Button):
-                self.current_page += 1
-                if self.current_page >= len(self.pages) - 1:
-                    self.current_page = len(self.pages) - 1
-                    button.disabled = True
-                self.children[0].disabled = False
-                await interaction.response.edit_message(embed=self.pages[self.current_page], view=self)
+# Season1 Leaderboard Command
+@bot.tree.command(name="season1", description="Display the Season 1 leaderboard.")
+async def season1(interaction: discord.Interaction):
+    await send_season_leaderboard(interaction, 1)
 
-        # Send the leaderboard
-        if len(pages) > 1:
-            view = PaginationView(pages, interaction.user)
-            await interaction.followup.send(embed=pages[0], view=view)
-        else:
-            await interaction.followup.send(embed=pages[0])
 
-    except Exception as e:
-        await interaction.followup.send(f"An error occurred: {e}")
-        print(f"Error: {e}")
+# Season2 Leaderboard Command
+@bot.tree.command(name="season2", description="Display the Season 2 leaderboard.")
+async def season2(interaction: discord.Interaction):
+    await send_season_leaderboard(interaction, 2)
 
 
 """ CTX command part """
 
 
-@bot.event
-async def on_command_error(ctx, error):
-    if isinstance(error, CommandOnCooldown):
-        pass
-
-    else:
-        raise error
+# Prefix commands are charged after their arguments parse, so a typo costs nothing and !help listings are free
+@bot.before_invoke
+async def charge_prefix_command(ctx):
+    retry_after = rate_limit(ctx.command.qualified_name, ctx.author, ctx.guild)
+    if retry_after:
+        raise RateLimitExceeded(retry_after)
 
 
 # Week Command
 @bot.command(name="week")
-@commands.cooldown(1, 2, commands.BucketType.user)
 async def week(ctx, week_number: int):
     await ctx.defer()
 
     try:
-        expected_headers = ['Week', 'Date', 'Name', 'Discord', 'Song Name', 'Listen Link', 'Comment', 'Buy / Hypeddit',
-                            'Week Image', 'Colour', 'Thumbnail Image']
-        data = sheet.get_all_records(expected_headers=expected_headers)
-
-        rows = [row for row in data if int(row['Week'].replace('Week ', '').strip()) == week_number]
+        rows = await get_week_rows(week_number)
 
         if not rows:
             await ctx.send(f"Week {week_number} not found in the spreadsheet.")
             return
 
-        week_date = rows[0]['Date']
-
-        await ctx_send_embed(ctx, rows, week_date)
+        await send_week_embed(ctx.send, ('week', week_number), rows)
 
     except Exception as e:
         await ctx.send(f"An error occurred: {e}")
-        print(f"Error: {e}")
+        log.exception("Command failed", extra=command_fields(ctx))
 
 
 # Lastweek Command
 @bot.command(name="lastweek")
-@commands.cooldown(1, 2, commands.BucketType.user)
 async def lastweek(ctx):
     await ctx.defer()
 
     try:
-        previous_friday = get_previous_friday().strftime('%A %d/%m/%y')
-
-        expected_headers = ['Week', 'Date', 'Name', 'Discord', 'Song Name', 'Listen Link', 'Comment', 'Buy / Hypeddit',
-                            'Week Image', 'Colour', 'Thumbnail Image']
-        data = sheet.get_all_records(expected_headers=expected_headers)
+        friday = get_previous_friday()
+        previous_friday = friday.strftime('%A %d/%m/%y')
 
-        rows = [row for row in data if row['Date'] == previous_friday]
+        rows = await get_date_rows(friday)
 
         if not rows:
             await ctx.send(f"No data found for {previous_friday}.")
             return
 
-        await ctx_send_embed(ctx, rows, previous_friday)
+        await send_week_embed(ctx.send, ('date', friday.toordinal()), rows)
 
     except Exception as e:
         await ctx.send(f"An error occurred: {e}")
-        print(f"Error: {e}")
+        log.exception("Command failed", extra=command_fields(ctx))
 
 
 # Thisweek Command
 @bot.command(name="thisweek")
-@commands.cooldown(1, 2, commands.BucketType.user)
 async def thisweek(ctx):
     await ctx.defer()
 
     try:
-        this_friday = get_this_friday().strftime('%A %d/%m/%y')
-
-        expected_headers = ['Week', 'Date', 'Name', 'Discord', 'Song Name', 'Listen Link', 'Comment', 'Buy / Hypeddit',
-                            'Week Image', 'Colour', 'Thumbnail Image']
-        data = sheet.get_all_records(expected_headers=expected_headers)
+        friday = get_this_friday()
 
-        rows = [row for row in data if row['Date'] == this_friday]
+        rows = await get_date_rows(friday)
 
         if not rows:
             await ctx.send("Coming soon, please wait. Data for this Friday is not yet uploaded.")
             return
 
-        await ctx_send_embed(ctx, rows, this_friday)
+        await send_week_embed(ctx.send, ('date', friday.toordinal()), rows)
 
     except Exception as e:
         await ctx.send(f"An error occurred: {e}")
-        print(f"Error: {e}")
+        log.exception("Command failed", extra=command_fields(ctx))
+
 
 @bot.command(name="profile", description="Fetch your stats or another users.")
 async def profile(ctx, user: discord.Member = None):
@@ -1010,429 +2052,262 @@ async def profile(ctx, user: discord.Member = None):
         user = ctx.author
     
     discord_id = str(user.id)
-    excluded_user_id = '762317361822564412'
 
     try:
-        expected_headers = ['Week', 'Date', 'Name', 'Discord', 'Song Name', 'Listen Link', 'Roles for Profile']
-        data = sheet.get_all_records(expected_headers=expected_headers)
-
-        # Overall Rank (All-time)
-        overall_mention_counts = {}
-        for row in data:
-            uid = str(row.get('Discord'))
-            if uid and uid != excluded_user_id:
-                overall_mention_counts[uid] = overall_mention_counts.get(uid, 0) + 1
-        overall_rank_field = None
-        if discord_id in overall_mention_counts:
-            sorted_overall = sorted(
-                {k: v for k, v in overall_mention_counts.items() if k != excluded_user_id}.items(),
-                key=lambda x: x[1], reverse=True
-            )
-            for idx, (uid, _) in enumerate(sorted_overall):
-                if uid == discord_id:
-                    overall_rank_field = idx + 1
-                    break
-        elif discord_id != excluded_user_id:
-             overall_rank_field = len(overall_mention_counts) + 1
-
-        # Leaderboard Rank (Season)
-        period_start = datetime(2024, 12, 3)
-        period_end = datetime(2025, 12, 2)
-        ranking_counts = {}
-        for row in data:
-            date_val = parse_date(row['Date'])
-            if date_val and period_start <= date_val <= period_end:
-                uid = str(row.get('Discord'))
-                if uid and uid != excluded_user_id:
-                    ranking_counts[uid] = ranking_counts.get(uid, 0) + 1
-        leaderboard_rank_field = None
-        if discord_id in ranking_counts:
-            sorted_season = sorted(ranking_counts.items(), key=lambda x: x[1], reverse=True)
-            for idx, (uid, _) in enumerate(sorted_season):
-                if uid == discord_id:
-                    leaderboard_rank_field = idx + 1
-                    break
-        elif discord_id != excluded_user_id:
-             leaderboard_rank_field = len(ranking_counts) + 1
-             
-        if discord_id == excluded_user_id:
-            overall_rank_field = '-'
-            leaderboard_rank_field = '-'
+        profile_data = await get_profile_data(discord_id)
 
         # Filter user data
-        user_data = [r for r in data if str(r.get('Discord')) == discord_id]
-        if not user_data:
+        if not profile_data['submissions']:
             await ctx.send(f"No data found for {user.mention}.")
             return
-        user_data.sort(key=lambda r: parse_date(r['Date']) or datetime.min, reverse=True)
 
-        # Roles
-        role_ids_from_sheet = set()
-        for row in data:
-            roles = row.get('Roles for Profile', "")
-            if roles:
-                try:
-                    if isinstance(roles, int):
-                        role_ids_from_sheet.add(roles)
-                    elif isinstance(roles, str):
-                        valid = [int(x.strip()) for x in roles.split(',') if x.strip().isdigit()]
-                        role_ids_from_sheet.update(valid)
-                except ValueError:
-                    print(f"Warning: Could not parse role ID from '{roles}' in sheet.")
-        user_role_ids = {role.id for role in user.roles}
-        matched = user_role_ids.intersection(role_ids_from_sheet)
-        matched_mentions = [f"<@&{rid}>" for rid in matched]
-
-        # Build pages & pagination (same as above)
-        pages = []
-        per_page = 5
-        batch = []
-        def make_embed(entries):
-            emb = discord.Embed(
-                title=f"{user.display_name}'s NMF Profile",
-                color=discord.Color.from_str("#3618f6"),
-                timestamp=datetime.now(dt.timezone.utc)
-            )
-            emb.set_thumbnail(url=user.avatar.url)
-            emb.add_field(name="Selection(s)", value="\n".join(entries), inline=False)
-            if matched_mentions:
-                emb.add_field(name="Awarded", value=" ".join(matched_mentions), inline=False)
-            emb.add_field(name="Total Mentions", value=f"**{len(user_data)}**", inline=True)
-            if overall_rank_field is not None:
-                emb.add_field(name="Overall Rank", value=f"**{overall_rank_field}**", inline=True)
-            if leaderboard_rank_field is not None:
-                emb.add_field(name="Season Rank", value=f"**{leaderboard_rank_field}**", inline=True)
-            return emb
-        for row in user_data:
-            week = row.get('Week', 'Unknown Week')
-            song = row.get('Song Name', 'Unknown Song')
-            link = row.get('Listen Link', '')
-            batch.append(f"{week} - [{song}]({link})")
-            if len(batch) >= per_page:
-                pages.append(make_embed(batch)); batch = []
-        if batch: pages.append(make_embed(batch))
-
-        if not pages:
-            await ctx.send("Could not generate profile embed.")
-            return
-        message = await ctx.send(embed=pages[0])
-
-        if len(pages) > 1:
-            class PaginationView(View):
-                def __init__(self, pages, user, message):
-                    super().__init__(timeout=180)
-                    self.pages = pages; self.current = 0; self.user = user; self.message = message
-                    if len(pages) <= 1: self.children[1].disabled = True
-
-                async def interaction_check(self, interaction):
-                    if interaction.user != self.user:
-                        await interaction.response.send_message("You cannot control this pagination.", ephemeral=True)
-                        return False
-                    return True
-
-                @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary, disabled=True)
-                async def prev(self, interaction, button: Button):
-                    self.current = max(self.current-1, 0)
-                    button.disabled = self.current == 0
-                    self.children[1].disabled = False
-                    await interaction.response.edit_message(embed=self.pages[self.current], view=self)
-
-                @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
-                async def nxt(self, interaction, button: Button):
-                    self.current = min(self.current+1, len(self.pages)-1)
-                    button.disabled = self.current == len(self.pages)-1
-                    self.children[0].disabled = False
-                    await interaction.response.edit_message(embed=self.pages[self.current], view=self)
-
-                async def on_timeout(self):
-                    for item in self.children: item.disabled = True
-                    try:
-                        orig = await ctx.channel.fetch_message(self.message.id)
-                        await orig.edit(view=self)
-                    except Exception:
-                        pass
-
-            view = PaginationView(pages, ctx.author, message)
-            await message.edit(embed=pages[0], view=view)
+        profile_pages = ProfilePages(user, profile_data)
+        await send_pages(ctx.send, 'pf', user.id, profile_pages.render, profile_pages.page_count(), ctx.author.id)
 
     except gspread.exceptions.APIError as e:
         await ctx.send(f"Error accessing Google Sheet. Please check credentials and sheet permissions. Details: {e}")
-        print(f"GSpread API Error: {e}")
+        log.error("GSpread API Error: %s", e, extra=command_fields(ctx))
     except Exception as e:
         await ctx.send(f"An unexpected error occurred: {e}")
-        traceback.print_exc()
+        log.exception("Command failed", extra=command_fields(ctx))
 
-# Season1 Leaderboard Command
-@bot.command(name="season1", aliases=['lastseason', 'leaderboard1'],
-             description="Display the Season 1 leaderboard.")
-async def season1(ctx):
-    loading_message = await ctx.send("Loading leaderboard...")
-    excluded_user_id = '762317361822564412'
 
-    try:
-        # Fetch all spreadsheet data
-        expected_headers = ['Week', 'Date', 'Name', 'Discord', 'Song Name', 'Listen Link',
-                            'Season starts 4th December', 'NMF Leaderboard Thumbnail', 'Top right image',
-                            'Leaderboard Colour']
-        data = sheet.get_all_records(expected_headers=expected_headers)
-
-        # Filter metadata for Season 1
-        season_metadata_row = next((row for row in data if row.get('Season starts 4th December') == 'Season1'), None)
-        if not season_metadata_row:
-            await loading_message.edit(content="Season 1 metadata not found in the spreadsheet.")
-            return
-
-        # Extract Season 1 metadata
-        nmf_leaderboard_thumbnail = season_metadata_row.get('NMF Leaderboard Thumbnail', '')
-        top_right_image = season_metadata_row.get('Top right image', '')
-        thumbnail_colour = season_metadata_row.get('Leaderboard Colour', '#000000')
+# Season each of the old command names shows when no number is given; plain !season, like /season, shows the
+# current season
+SEASON_COMMAND_DEFAULTS = {
+    'season1': 1, 'leaderboard1': 1, 'season2': 2, 'leaderboard2': 2,
+    'lastseason': CURRENT_SEASON - 1, 'thisseason': CURRENT_SEASON, 'currentseason': CURRENT_SEASON,
+}
 
-        # Fetch Season 1 leaderboard data (Weeks 1-49)
-        season1_data = [row for row in data if
-                        'Week' in row and row['Week'].startswith("Week") and int(row['Week'].split()[1]) <= 49]
 
-        mention_counts = {}
-        user_names = {}
-        for row in season1_data:
-            discord_id = str(row['Discord'])
-            name = row['Name']
-            mention_counts[discord_id] = mention_counts.get(discord_id, 0) + 1
-            user_names[discord_id] = name
-
-            # Sort leaderboard by mentions
-        sorted_leaderboard = sorted(mention_counts.items(), key=lambda x: x[1], reverse=True)
+# Season Leaderboard Command
+@bot.command(name="season", aliases=list(SEASON_COMMAND_DEFAULTS),
+             description="Display a season's leaderboard.")
+async def season_leaderboard(ctx, number: int = None):
+    if number is None:
+        number = SEASON_COMMAND_DEFAULTS.get(ctx.invoked_with, CURRENT_SEASON)
+    loading_message = await ctx.send("Loading leaderboard...")
 
-        filtered_leaderboard = [item for item in sorted_leaderboard if item[0] != excluded_user_id]
-        total_entries = len(filtered_leaderboard)
-
-        # Paginate leaderboard (5 users per page)
-        pages = []
-        users_per_page = 10
-        for i in range(0, len(filtered_leaderboard), users_per_page):
-            page_data = filtered_leaderboard[i:i + users_per_page]
-            leaderboard_lines = []
-            for index, (user_id, mention_count) in enumerate(page_data, start=i + 1):
-                # Convert user_id to string and check validity
-                user_id = str(user_id)
-                if user_id.isdigit():
-                    mention = f"<@{user_id}>"
-                else:
-                    mention = user_names.get(user_id, "Unknown User")
-
-                leaderboard_lines.append(f"**{index}.** {mention} — **{mention_count} mentions**")
-            embed_description = (
-                f"👥 Drum&BassHeadsUK\n"
-                f"👑Leaderboard👑\n"
-                f"👉 Season: 1\n"
-                f"👫 Entries: {total_entries}\n\n"
-                f"" + "\n".join(leaderboard_lines)
-            )
-
-            # Create embed
-            embed = discord.Embed(
-                description=embed_description,
-                color=discord.Color.from_str(thumbnail_colour),
-            )
-            current_page_num = i // users_per_page + 1
-            embed.set_footer(text=f"Page {current_page_num}")
-            embed.set_thumbnail(url=top_right_image)
-            embed.set_image(url=nmf_leaderboard_thumbnail)
-            pages.append(embed)
-
-        # Pagination logic for ctx commands
-        class PaginationView(discord.ui.View):
-            def __init__(self, pages, original_user):
-                super().__init__(timeout=None)
-                self.pages = pages
-                self.current_page = 0
-                self.original_user = original_user
-                self.user_warnings = set()
-
-            async def interaction_check(self, interaction: discord.Interaction) -> bool:
-                if interaction.user != self.original_user:
-                    if interaction.user.id not in self.user_warnings:
-                        await interaction.response.send_message(
-                            f"This was opened by {self.original_user.mention}, you can't do that!",
-                            ephemeral=True
-                        )
-                        self.user_warnings.add(interaction.user.id)
-                    return False
-                return True
-
-            @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary, disabled=True)
-            async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-                self.current_page -= 1
-                if self.current_page <= 0:
-                    self.current_page = 0
-                    button.disabled = True
-                self.children[1].disabled = False
-                await interaction.response.edit_message(embed=self.pages[self.current_page], view=self)
-
-            @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
-            async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-                self.current_page += 1
-                if self.current_page >= len(self.pages) - 1:
-                    self.current_page = len(self.pages) - 1
-                    button.disabled = True
-                self.children[0].disabled = False
-                await interaction.response.edit_message(embed=self.pages[self.current_page], view=self)
+    try:
+        leaderboard, problem = await find_season_leaderboard(number)
+        if problem:
+            await loading_message.edit(content=problem)
+            return
 
         # Delete the loading message
         await loading_message.delete()
 
         # Send the leaderboard
-        if len(pages) > 1:
-            view = PaginationView(pages, ctx.author)
-            await ctx.send(embed=pages[0], view=view)
-        else:
-            await ctx.send(embed=pages[0])
+        await send_pages(ctx.send, 'lb', number, functools.partial(render_leaderboard_page, leaderboard),
+                         leaderboard_page_count(leaderboard), ctx.author.id)
 
     except Exception as e:
         if loading_message:
             await loading_message.edit(content=f"An error occurred: {e}")
         else:
             await ctx.send(f"An error occurred: {e}")
-        print(f"Error: {e}")
+        log.exception("Command failed", extra=command_fields(ctx))
 
 
-# Season2 Leaderboard Command
-@bot.command(name="season2", aliases=['thisseason', 'currentseason', 'leaderboard2'],
-             description="Display the Season 2 leaderboard.")
-async def season2(ctx):
-    loading_message = await ctx.send("Loading leaderboard...")
-    excluded_user_id = '762317361822564412'
+# 429s, Discord server errors and dropped connections are worth another try; 403s and 404s are not
+def is_transient_discord_error(error):
+    if isinstance(error, discord.HTTPException):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (discord.RateLimited, aiohttp.ClientError, asyncio.TimeoutError, OSError))
 
-    try:
-        # Fetch all spreadsheet data
-        expected_headers = ['Week', 'Date', 'Name', 'Discord', 'Song Name', 'Listen Link',
-                            'Season starts 4th December', 'NMF Leaderboard Thumbnail', 'Top right image',
-                            'Leaderboard Colour']
-        data = sheet.get_all_records(expected_headers=expected_headers)
-
-        # Filter metadata for Season 2
-        season_metadata_row = next((row for row in data if row.get('Season starts 4th December') == 'Season2'), None)
-        if not season_metadata_row:
-            await loading_message.edit(content="Season 2 metadata not found in the spreadsheet.")
-            return
 
-        # Extract Season 2 metadata
-        nmf_leaderboard_thumbnail = season_metadata_row.get('NMF Leaderboard Thumbnail', '')
-        top_right_image = season_metadata_row.get('Top right image', '')
-        thumbnail_colour = season_metadata_row.get('Leaderboard Colour', '#000000')
-
-        # Define season 2 date range
-        season2_start = datetime(2024, 12, 3)
-        season2_end = datetime(2025, 12, 2)
-
-        # Filter Season 2 data based on the date range
-        season2_data = [
-            row for row in data
-            if 'Date' in row and parse_date(row['Date']) and season2_start <= parse_date(row['Date']) <= season2_end
-        ]
-
-        mention_counts = {}
-        user_names = {}
-        for row in season2_data:
-            discord_id = str(row['Discord'])
-            name = row['Name']
-            mention_counts[discord_id] = mention_counts.get(discord_id, 0) + 1
-            user_names[discord_id] = name
-
-            # Sort leaderboard by mentions
-        sorted_leaderboard = sorted(mention_counts.items(), key=lambda x: x[1], reverse=True)
-        filtered_leaderboard = [item for item in sorted_leaderboard if item[0] != excluded_user_id]
-        total_entries = len(filtered_leaderboard)
-
-        # Paginate leaderboard (5 users per page)
-        pages = []
-        users_per_page = 10
-        for i in range(0, len(filtered_leaderboard), users_per_page):
-            page_data = filtered_leaderboard[i:i + users_per_page]
-            leaderboard_lines = []
-            for index, (user_id, mention_count) in enumerate(page_data, start=i + 1):
-                # Convert user_id to string and check validity
-                user_id = str(user_id)
-                if user_id.isdigit():
-                    mention = f"<@{user_id}>"
-                else:
-                    mention = user_names.get(user_id, "Unknown User")
-
-                leaderboard_lines.append(f"**{index}.** {mention} — **{mention_count} mentions**")
-            embed_description = (
-                f"👥 Drum&BassHeadsUK\n"
-                f"👑Leaderboard👑\n"
-                f"👉 Season: 2\n"
-                f"👫 Entries: {total_entries}\n\n"
-                f"" + "\n".join(leaderboard_lines)
-            )
-
-            # Create embed
-            embed = discord.Embed(
-                description=embed_description,
-                color=discord.Color.from_str(thumbnail_colour),
-            )
-            current_page_num = i // users_per_page + 1
-            embed.set_footer(text=f"Page {current_page_num}")
-            embed.set_thumbnail(url=top_right_image)
-            embed.set_image(url=nmf_leaderboard_thumbnail)
-            pages.append(embed)
-
-        # Pagination logic for ctx commands
-        class PaginationView(discord.ui.View):
-            def __init__(self, pages, original_user):
-                super().__init__(timeout=None)
-                self.pages = pages
-                self.current_page = 0
-                self.original_user = original_user
-                self.user_warnings = set()
-
-            async def interaction_check(self, interaction: discord.Interaction) -> bool:
-                if interaction.user != self.original_user:
-                    if interaction.user.id not in self.user_warnings:
-                        await interaction.response.send_message(
-                            f"This was opened by {self.original_user.mention}, you can't do that!",
-                            ephemeral=True
-                        )
-                        self.user_warnings.add(interaction.user.id)
-                    return False
-                return True
-
-            @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary, disabled=True)
-            async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-                self.current_page -= 1
-                if self.current_page <= 0:
-                    self.current_page = 0
-                    button.disabled = True
-                self.children[1].disabled = False
-                await interaction.response.edit_message(embed=self.pages[self.current_page], view=self)
-
-            @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
-            async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-                self.current_page += 1
-                if self.current_page >= len(self.pages) - 1:
-                    self.current_page = len(self.pages) - 1
-                    button.disabled = True
-                self.children[0].disabled = False
-                await interaction.response.edit_message(embed=self.pages[self.current_page], view=self)
+# Wait as long as Discord asked for, otherwise back off exponentially with jitter
+def discord_retry_delay(error, attempt):
+    retry_after = getattr(error, 'retry_after', None)
+    if retry_after:
+        return retry_after
+    return ROLE_ASSIGN_BACKOFF * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
 
-        # Delete the loading message
-        await loading_message.delete()
 
-        # Send the leaderboard
-        if len(pages) > 1:
-            view = PaginationView(pages, ctx.author)
-            await ctx.send(embed=pages[0], view=view)
-        else:
-            await ctx.send(embed=pages[0])
+# Mentions for a report, cut short with a count of the rest
+def format_user_list(title, user_ids, limit=ROLE_REPORT_MAX_MENTIONS):
+    lines = [f"<@{user_id}>" for user_id in user_ids[:limit]]
+    if len(user_ids) > limit:
+        lines.append(f"...and {len(user_ids) - limit} more")
+    return f"{title}\n" + "\n".join(lines) + "\n\n"
 
-    except Exception as e:
-        if loading_message:
-            await loading_message.edit(content=f"An error occurred: {e}")
-        else:
-            await ctx.send(f"An error occurred: {e}")
-        print(f"Error: {e}")
+
+def fit_message(content):
+    if len(content) <= DISCORD_MESSAGE_LIMIT:
+        return content
+    return content[:DISCORD_MESSAGE_LIMIT - 4] + "\n..."
 
 
+class RoleLedger:
+    """Roles !autoassign has handed out, by season and user, persisted so later runs skip those users."""
+
+    def __init__(self, path, save_every=ROLE_LEDGER_SAVE_EVERY, save_interval=ROLE_LEDGER_SAVE_INTERVAL):
+        self.path = path
+        self.save_every = save_every
+        self.save_interval = save_interval
+        self.entries = {}  # (season, user ID) -> (role ID, assigned at)
+        self.unsaved = 0
+        self.saved_at = time.monotonic()
+
+    def has(self, season, user_id, role_id):
+        entry = self.entries.get((season, user_id))
+        return entry is not None and entry[0] == role_id
+
+    def record(self, season, user_id, role_id):
+        self.entries[(season, user_id)] = (role_id, time.time())
+        self.unsaved += 1
+        # Saved in batches, so an interrupted run loses at most one batch and redoes only those members
+        if self.unsaved >= self.save_every or time.monotonic() - self.saved_at >= self.save_interval:
+            self.flush()
+
+    def flush(self):
+        if not self.unsaved:
+            return
+        try:
+            self.save()
+        except OSError as e:
+            log.error("Could not save role ledger to %s: %s", self.path, e)
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as ledger_file:
+                data = json.load(ledger_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            log.warning("Could not load role ledger from %s: %s", self.path, e)
+            return
+
+        for entry in data.get('assignments', []):
+            self.entries[(entry['season'], entry['user_id'])] = (entry['role_id'], entry['assigned_at'])
+
+    def save(self):
+        # Write to a temporary file first so a crash never leaves a half-written ledger behind
+        assignments = [{'season': season, 'user_id': user_id, 'role_id': role_id, 'assigned_at': assigned_at}
+                       for (season, user_id), (role_id, assigned_at) in self.entries.items()]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as ledger_file:
+            json.dump({'assignments': assignments}, ledger_file)
+        os.replace(tmp_path, self.path)
+        self.unsaved = 0
+        self.saved_at = time.monotonic()
+
+
+role_ledger = RoleLedger(ROLE_TRACKING_FILE)
+role_ledger.load()
+
+
+class RoleAssignment:
+    """Adds one role to many members with bounded concurrency, retries and live progress on a message.
+
+    Users already in the ledger for this season and role are skipped without a lookup, and every member
+    found with the role is added to it.
+    """
+
+    def __init__(self, guild, role, season, reason, ledger=role_ledger):
+        self.guild = guild
+        self.role = role
+        self.season = season
+        self.reason = reason
+        self.ledger = ledger
+        self.in_ledger = []
+        self.assigned = []
+        self.already_had = []
+        self.not_in_server = []
+        self.failed = {}  # user ID -> last error
+        self.total = 0
+        self.done = 0
+        self.retries = 0
+        self.slowest = 0.0
+        self.elapsed = 0.0
+        self.finished = asyncio.Event()
+
+    async def run(self, user_ids, progress_message):
+        self.total = len(user_ids)
+        semaphore = asyncio.Semaphore(ROLE_ASSIGN_CONCURRENCY)
+        started = time.perf_counter()
+        progress = asyncio.create_task(self.show_progress(progress_message))
+        try:
+            await asyncio.gather(*(self.assign(user_id, semaphore) for user_id in user_ids))
+        finally:
+            self.ledger.flush()
+            self.elapsed = time.perf_counter() - started
+            # Let an edit in flight land before the caller posts the final report over it
+            self.finished.set()
+            await progress
+        log.info("Role assignment for %s: %s in %.1fs", self.role.name, self.progress_text(), self.elapsed)
+
+    async def assign(self, user_id, semaphore):
+        if self.ledger.has(self.season, user_id, self.role.id):
+            self.in_ledger.append(user_id)
+            self.done += 1
+            return
+        member = self.guild.get_member(user_id)
+        if not member:
+            self.not_in_server.append(user_id)
+        elif self.role in member.roles:
+            self.already_had.append(user_id)
+            self.ledger.record(self.season, user_id, self.role.id)
+        else:
+            async with semaphore:
+                await self.add_role(member)
+        self.done += 1
+
+    async def add_role(self, member):
+        started = time.perf_counter()
+        for attempt in range(1, ROLE_ASSIGN_ATTEMPTS + 1):
+            try:
+                await member.add_roles(self.role, reason=self.reason)
+            except Exception as e:
+                if attempt == ROLE_ASSIGN_ATTEMPTS or not is_transient_discord_error(e):
+                    self.failed[member.id] = e
+                    log.warning("Failed to assign %s to %s after %d attempt(s): %s", self.role.name, member.id,
+                                attempt, e)
+                    break
+                self.retries += 1
+                await asyncio.sleep(discord_retry_delay(e, attempt))
+            else:
+                self.assigned.append(member.id)
+                self.ledger.record(self.season, member.id, self.role.id)
+                break
+        self.slowest = max(self.slowest, time.perf_counter() - started)
+
+    # Edit the message every few seconds while anything has changed since the last edit
+    async def show_progress(self, message):
+        shown = 0
+        while not self.finished.is_set():
+            try:
+                await asyncio.wait_for(self.finished.wait(), ROLE_ASSIGN_PROGRESS_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            if self.finished.is_set() or self.done == shown:
+                continue
+            shown = self.done
+            try:
+                await message.edit(content=f"Assigning {self.role.name}... {self.progress_text()}")
+            except discord.HTTPException as e:
+                log.debug("Could not update role assignment progress: %s", e)
+
+    def progress_text(self):
+        return (f"{self.done}/{self.total} processed, {len(self.assigned)} assigned, {len(self.failed)} failed, "
+                f"{self.retries} retries")
+
+    def report(self):
+        response = ""
+        if self.not_in_server:
+            response += format_user_list("Users eligible but not in server:", self.not_in_server)
+        if self.assigned:
+            response += format_user_list("Users successfully assigned the role:", self.assigned)
+        if self.failed:
+            response += format_user_list("Users the role could not be assigned to:", list(self.failed))
+            errors = Counter(type(e).__name__ if not isinstance(e, discord.HTTPException) else f"HTTP {e.status}"
+                             for e in self.failed.values())
+            response += "Errors: " + ", ".join(f"{error} x{count}" for error, count in errors.items()) + "\n\n"
+        response += (f"{self.total} eligible, {len(self.in_ledger)} assigned on earlier runs, {len(self.assigned)} "
+                     f"assigned, {len(self.already_had)} already had the role, {len(self.not_in_server)} not in "
+                     f"server, {len(self.failed)} failed. "
+                     f"Took {self.elapsed:.1f}s ({self.retries} retries, slowest member {self.slowest:.1f}s).")
+        return response
 
 
 @bot.command(name="autoassign")
@@ -1441,25 +2316,13 @@ async def autorole(ctx, season: int):
     processing_message = await ctx.send("Processing...")
 
     try:
-        # Fetch all records
-        data = sheet.get_all_records(expected_headers=['Week', 'Date', 'Discord', 'Autorole Seasons', 'Role Id'])
-        # Build the dictionary of season -> role_id
-        role_data = {}
-        for row in data:
-            if 'Autorole Seasons' in row and row['Autorole Seasons'] and 'Role Id' in row:
-                try:
-                    season_number = int(row['Autorole Seasons'])
-                    role_id_value = int(row['Role Id'])
-                    role_data[season_number] = role_id_value
-                except ValueError:
-                    print(f"Skipping row due to invalid season/role ID: {row}")
-
-
+        await get_sheet_rows()
+        # Season -> role_id, read from the sheet when the snapshot was ingested
+        role_data = sheet_cache.autorole_roles
 
         # Check if the season is in role_data
         if season not in role_data:
             msg = f"No role ID found for season {season}. Please check the sheet."
-            print(f"DEBUG: {msg}")
             await processing_message.edit(content=msg)
             return
 
@@ -1472,201 +2335,55 @@ async def autorole(ctx, season: int):
             await processing_message.edit(content=msg)
             return
 
-        # -------------------------
-        #         SEASON 2
-        # -------------------------
-        if season == 2:
-            # Define date range
-            try:
-                start_date = datetime.strptime("03/12/24", "%d/%m/%y")
-                end_date = datetime.strptime("02/12/25", "%d/%m/%y")
-            except Exception as e:
-                msg = f"Error parsing date boundaries: {e}"
-                print(f"DEBUG: {msg}")
-                await processing_message.edit(content=msg)
-                return
-
-            # Filter rows based on Date column
-            season_data = []
-            for row in data:
-                # Make sure 'Date' column exists and is non-empty
-                if 'Date' in row and row['Date']:
-                    # We expect something like "Friday 08/03/24"
-                    parts = row['Date'].split()
-                    if len(parts) > 1:
-                        date_str = parts[1]  # "08/03/24"
-                        try:
-                            row_date = datetime.strptime(date_str, "%d/%m/%y")
-                            # Check if within range
-                            if start_date <= row_date <= end_date:
-                                season_data.append(row)
-                            else:
-                                print(f"DEBUG: Row date out of range => {row}")
-                        except ValueError:
-                            print(f"DEBUG: Could not parse date => {row}")
-                    else:
-                        print(f"DEBUG: Date format not recognized => {row['Date']}")
-                else:
-                    print(f"DEBUG: No valid 'Date' found => {row}")
-
-
-            for sd in season_data:
-                print(sd)
-            # Now gather Discord IDs from season_data
-            discord_ids = []
-            for row in season_data:
-                if row.get('Discord'):
-                    discord_ids.append(row['Discord'])
-
-
-
-            # Convert to int where possible
-            valid_ids = []
-            for discord_id in discord_ids:
-                try:
-                    valid_ids.append(int(discord_id))
-                except ValueError:
-                    print(f"DEBUG: Skipping invalid Discord ID => {discord_id}")
-
- 
-            # Count occurrences
-            user_counts = Counter(valid_ids)
-
-
-            # Eligible if user appears >= 3 times
-            eligible_users = {user_id: count for user_id, count in user_counts.items() if count >= 3}
-
-            # Tracking
-            not_in_server = []
-            successfully_assigned = []
-
-            # Assign roles
-            for user_id, count in eligible_users.items():
-                member = ctx.guild.get_member(user_id)
-                if not member:
-                    not_in_server.append(user_id)
-                    continue
-
-                # Skip if member already has the role
-                if role in member.roles:
-                    print(f"DEBUG: Member {user_id} already has the role.")
-                    continue
-
-                # Attempt to assign role
-                try:
-                    await member.add_roles(role, reason="Met criteria for role assignment (Season 2)")
-                    successfully_assigned.append(user_id)
-                except Exception as e:
-                    print(f"DEBUG: Failed to assign role to {user_id}: {e}")
-
-            # Build final response
-            response = f"Successfully processed role assignment for season {season}.\n\n"
-
-            if not eligible_users:
-                response += "No eligible users found for Season 2 in the specified date range.\n\n"
-
-            if not_in_server:
-                response += "Users eligible but not in server:\n" + "\n".join(
-                    [f"<@{user}>" for user in not_in_server]) + "\n\n"
-
-            if successfully_assigned:
-                response += "Users successfully assigned the role:\n" + "\n".join(
-                    [f"<@{user}>" for user in successfully_assigned]) + "\n"
-
-
-            await processing_message.edit(content=response)
+        season_definition = SEASONS.get(season)
+        if season_definition is None:
+            msg = f"I can't find Season {season} data in the sheet, sorry."
+            await processing_message.edit(content=msg)
             return
 
-        # -------------------------
-        #         SEASON 1
-        # -------------------------
-        elif season == 1:
-            # Filter rows up to Week 49
-            season_data = []
-            for row in data:
-                if 'Week' in row and row['Week'] and row['Week'].startswith("Week"):
-                    try:
-                        week_num = int(row['Week'].split()[1])
-                        if week_num <= 49:
-                            season_data.append(row)
-                        else:
-                            print(f"DEBUG: Row excluded (Week > 49) => {row}")
-                    except ValueError:
-                        print(f"DEBUG: Could not parse week => {row['Week']}")
-                else:
-                    print(f"DEBUG: Row missing or invalid 'Week' => {row}")
-
-            # Gather Discord IDs
-            discord_ids = []
-            for row in season_data:
-                if row.get('Discord'):
-                    discord_ids.append(row['Discord'])
-
-
-
-            # Convert to int where possible
-            valid_ids = []
-            for discord_id in discord_ids:
-                try:
-                    valid_ids.append(int(discord_id))
-                except ValueError:
-                    print(f"DEBUG: Invalid Discord ID => {discord_id}")
-
-
-
-            # Count occurrences
-            user_counts = Counter(valid_ids)
+        # Eligible if the user was mentioned at least the season's threshold number of times
+        leaderboard = await get_season_leaderboard(season)
+        eligible_users = leaderboard.eligible_user_ids(season_definition.role_threshold)
 
-            # Eligible if user appears >= 2 times
-            eligible_users = {user_id: count for user_id, count in user_counts.items() if count >= 2}
+        response = f"Successfully processed role assignment for season {season}.\n\n"
+        if not eligible_users:
+            response += (f"No eligible users found for Season {season} ({season_definition.role_threshold}+ mentions, "
+                         f"{season_definition.describe()}).\n\n")
 
+        assignment = RoleAssignment(ctx.guild, role, season,
+                                    reason=f"Met criteria for role assignment (Season {season})")
+        await assignment.run(eligible_users, processing_message)
 
-            not_in_server = []
-            successfully_assigned = []
-
-            # Assign roles
-            for user_id in eligible_users:
-                member = ctx.guild.get_member(user_id)
-                if not member:
-                    not_in_server.append(user_id)
-                    continue
-
-                if role in member.roles:
-                    continue
-
-                try:
-                    await member.add_roles(role, reason="Met criteria for role assignment (Season 1)")
-                    successfully_assigned.append(user_id)
-                except Exception as e:
-                    print(f"DEBUG: Failed to assign role to {user_id} (Season 1): {e}")
-
-            # Build final response
-            response = f"Successfully assigned the role for season {season}.\n\n"
-
-            if not eligible_users:
-                response += "No eligible users found (2+ mentions up to Week 49).\n\n"
-
-            if not_in_server:
-                response += "Users eligible but not in server:\n" + "\n".join(
-                    [f"<@{user}>" for user in not_in_server]) + "\n\n"
-
-            if successfully_assigned:
-                response += "Users successfully assigned the role:\n" + "\n".join(
-                    [f"<@{user}>" for user in successfully_assigned]) + "\n"
-
-
-            await processing_message.edit(content=response)
-            return
-
-        else:
-            msg = f"I can't find Season {season} data in the sheet, sorry."
-            await processing_message.edit(content=msg)
+        response += assignment.report()
+        await processing_message.edit(content=fit_message(response))
 
     except Exception as e:
         msg = f"An error occurred: {e}"
         await processing_message.edit(content=msg)
 
 
+@bot.command(name="cachestats")
+@commands.has_permissions(manage_roles=True)
+async def cachestats(ctx):
+    stats = thumbnail_cache.stats()
+    embed = discord.Embed(title="Cache Stats", color=discord.Color.blue())
+    embed.add_field(name="Thumbnail Entries", value=f"{stats['entries']} ({stats['negative']} negative)", inline=True)
+    embed.add_field(name="Thumbnail Hits / Misses", value=f"{stats['hits']} / {stats['misses']}", inline=True)
+    embed.add_field(name="Thumbnail Hit Rate", value=f"{stats['hit_rate']:.1%}", inline=True)
+    embed.add_field(name="Sheet Rows", value=f"{sheet_cache.synced_rows}", inline=True)
+    embed.add_field(name="Snapshot Version", value=f"{sheet_cache.version}", inline=True)
+    embed.add_field(name="Unchanged Refreshes Skipped", value=f"{sheet_cache.skipped_refreshes}", inline=True)
+    embed.add_field(name="Fetches Started / Coalesced", value=f"{fetch_flights.started} / {fetch_flights.coalesced}",
+                    inline=True)
+    embed.add_field(name="Week Embed Hits / Misses", value=f"{week_embed_cache.hits} / {week_embed_cache.misses}",
+                    inline=True)
+    embed.add_field(name="Rate Limit Allowed / Refused", value=f"{rate_limiter.allowed} / {rate_limiter.refused}",
+                    inline=True)
+    embed.add_field(name="Rate Limit Buckets", value=f"{len(rate_limiter.buckets)}", inline=True)
+    trigger_hits = ', '.join(f"{name}: {count}" for name, count in message_triggers.hits.items()) or "None"
+    embed.add_field(name="Message Trigger Hits", value=trigger_hits, inline=False)
+    await ctx.send(embed=embed)
+
 
 @bot.event
 async def on_command_error(ctx, error):
@@ -1680,9 +2397,24 @@ async def on_command_error(ctx, error):
     elif isinstance(error, commands.CommandNotFound):
         # Ignore CommandNotFound errors or handle them
         pass
+    elif isinstance(error, RateLimitExceeded):
+        # Refused by the rate limiter; the notice disappears once the command can be used again
+        if rate_limiter.should_warn(ctx.author.id, error.retry_after):
+            await ctx.send(f"Slow down! Try again in {math.ceil(error.retry_after)}s.",
+                           delete_after=max(error.retry_after, 3))
     else:
         # Log unexpected errors with a short and custom message instead of a traceback
-        print(f"[ERROR] An unexpected error occurred: {type(error).__name__} - {error}")
+        log.error("An unexpected error occurred: %s - %s", type(error).__name__, error, extra=command_fields(ctx))
+
+
+@bot.event
+async def on_command_completion(ctx):
+    log.debug("Command completed", extra=command_fields(ctx))
+
+
+@bot.event
+async def on_app_command_completion(interaction, command):
+    log.debug("Command completed", extra=command_fields(interaction))
 
 
 # on_message function to handle messages
@@ -1692,12 +2424,13 @@ async def on_message(message):
     if message.author == bot.user:
         return
 
-    # Check for trigger words and send the help embed if found
-    if "commands?" in message.content.lower() or "command?" in message.content.lower():
-        await handle_command_help(message)
+    # Cheap checks before any string work: other bots and muted channels never fire triggers
+    if not message.author.bot and message.channel.id not in TRIGGER_IGNORED_CHANNEL_IDS:
+        await message_triggers.dispatch(message)
 
     # Ensure other commands are still processed
     await bot.process_commands(message)
 
 
-bot.run(os.getenv("TOKEN"))
+# Logging is already set up above, so discord.py should not install its own handler
+bot.run(os.getenv("TOKEN"), log_handler=None)